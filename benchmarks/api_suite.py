@@ -0,0 +1,274 @@
+"""
+Measure latency and query counts of the team API endpoints.
+
+Runs every scenario in-process with the Django test client against the
+configured database (SQLite or PostgreSQL, no server needed), inside a
+transaction that is rolled back, so writes do not change the data.
+Fill the database first:
+
+    python manage.py generate_benchmark_data --teams 1000 --people 1000000
+
+Usage:
+    DJANGO_SETTINGS_MODULE=team_service.settings_production \\
+        python benchmarks/api_suite.py --iterations 50 --output results.json \\
+        --compare previous.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "team_service.settings")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from benchmarks.http_load import percentile  # noqa: E402
+from teams.models import Person, Team  # noqa: E402
+
+
+# Teams per team-bulk-upsert request, compare with as many team-create requests
+BULK_SIZE = 100
+
+
+class Scenarios:
+    """Requests measured by the suite, each returns (method, url, data)"""
+
+    def __init__(self):
+        self.team_ids = list(Team.objects.order_by("id").values_list("id", flat=True))
+        self.department_ids = list(
+            Team.objects.filter(parent=None, children__isnull=False)
+            .distinct()
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        self.person_ids = list(
+            Person.objects.order_by("id").values_list("id", flat=True)[:1000]
+        )
+        self.sequence = count()
+
+        if not self.team_ids or not self.person_ids:
+            raise SystemExit("No data, run manage.py generate_benchmark_data first")
+
+    def pick(self, values):
+        return values[next(self.sequence) % len(values)]
+
+    def all(self):
+        scenarios = {
+            "team-list": lambda: ("get", reverse("teams:team-list"), None),
+            "team-list-deep-page": lambda: (
+                "get", reverse("teams:team-list"), {"page": len(self.team_ids) // 5}
+            ),
+            "team-list-cursor": lambda: (
+                "get", reverse("teams:team-list"), {"cursor": ""}
+            ),
+            "team-filter-name": lambda: (
+                "get", reverse("teams:team-list"), {"name": "Team 1"}
+            ),
+            "team-filter-min-members": lambda: (
+                "get",
+                reverse("teams:team-list"),
+                {"min_members": 1, "ordering": "-member_count"},
+            ),
+            "team-retrieve": lambda: (
+                "get", reverse("teams:team-detail", args=[self.pick(self.team_ids)]), None
+            ),
+            "team-members": lambda: (
+                "get", reverse("teams:team-members", args=[self.pick(self.team_ids)]), None
+            ),
+            "person-list": lambda: ("get", reverse("teams:person-list"), None),
+            "person-filter-last-name": lambda: (
+                "get", reverse("teams:person-list"), {"last_name": "shev"}
+            ),
+            "person-search": lambda: (
+                "get", reverse("teams:person-search"), {"q": "anna shev"}
+            ),
+            "person-retrieve": lambda: (
+                "get",
+                reverse("teams:person-detail", args=[self.pick(self.person_ids)]),
+                None,
+            ),
+            "change-feed": lambda: (
+                "get", reverse("teams:change-list"), {"limit": 100}
+            ),
+            "team-create": lambda: (
+                "post",
+                reverse("teams:team-list"),
+                {"name": f"Benchmark team {next(self.sequence)}"},
+            ),
+            "team-bulk-upsert": lambda: (
+                "post",
+                reverse("teams:team-bulk"),
+                {
+                    "upsert": [
+                        {"name": f"Benchmark team {next(self.sequence)}"}
+                        for number in range(BULK_SIZE)
+                    ]
+                },
+            ),
+            "person-create": lambda: (
+                "post",
+                reverse("teams:person-list"),
+                {
+                    "first_name": "Bench",
+                    "last_name": "Mark",
+                    "email": f"benchmark{next(self.sequence)}@example.com",
+                },
+            ),
+            "person-assign-to-team": lambda: (
+                "put",
+                reverse(
+                    "teams:person-assign-to-team", args=[self.pick(self.person_ids)]
+                ),
+                {"team": self.pick(self.team_ids)},
+            ),
+            "person-add-membership": lambda: (
+                "post",
+                reverse("teams:person-memberships", args=[self.pick(self.person_ids)]),
+                {"team": self.pick(self.team_ids), "role": "lead"},
+            ),
+        }
+
+        # Only with teams under departments (generate_benchmark_data --departments)
+        if self.department_ids:
+            scenarios["team-filter-ancestor"] = lambda: (
+                "get",
+                reverse("teams:team-list"),
+                {"ancestor": self.pick(self.department_ids), "omit": "members"},
+            )
+            scenarios["team-all-members"] = lambda: (
+                "get",
+                reverse("teams:team-all-members", args=[self.pick(self.department_ids)]),
+                {"cursor": ""},
+            )
+
+        return scenarios
+
+
+def measure(client, scenario, iterations, warmup):
+    latencies = []
+    queries = []
+
+    for number in range(warmup + iterations):
+        method, url, data = scenario()
+
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            elapsed = time.perf_counter() - started
+
+        if response.status_code >= 400:
+            raise SystemExit(f"{method.upper()} {url}: {response.status_code}")
+
+        if number >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+
+    latencies.sort()
+
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "queries": max(queries),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    print(f"\n{'scenario':>26} {'p50 before':>11} {'p50 now':>9} {'change':>8}")
+
+    for name, result in results["scenarios"].items():
+        before = previous["scenarios"].get(name)
+
+        if before is None:
+            continue
+
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        print(
+            f"{name:>26} {before['p50_ms']:9.2f}ms {result['p50_ms']:7.2f}ms "
+            f"{change:+7.1f}%"
+            + (
+                f"  queries {before['queries']} -> {result['queries']}"
+                if before["queries"] != result["queries"] else ""
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Results JSON of an earlier run")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "settings": os.environ["DJANGO_SETTINGS_MODULE"],
+        "database": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "teams": Team.objects.count(),
+        "people": Person.objects.count(),
+        "scenarios": {},
+    }
+
+    with transaction.atomic():
+        admin = get_user_model().objects.create_superuser(
+            "benchmark@example.com", "benchmark"
+        )
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(admin)
+
+        scenarios = Scenarios().all()
+
+        for name in args.scenario or scenarios:
+            result = measure(client, scenarios[name], args.iterations, args.warmup)
+            results["scenarios"][name] = result
+            print(
+                f"{name:>26}: p50 {result['p50_ms']:8.2f} ms, "
+                f"p95 {result['p95_ms']:8.2f} ms, p99 {result['p99_ms']:8.2f} ms, "
+                f"{result['queries']} queries"
+            )
+
+        transaction.set_rollback(True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare sync and async read views under growing client concurrency.
+
+Opens many concurrent connections from one asyncio event loop, so the
+load generator itself does not need a thread per client, and reports
+throughput and latency for every URL at every concurrency level.
+Start the server under an ASGI worker first, for example:
+
+    DJANGO_SETTINGS_MODULE=team_service.settings_production \\
+        uvicorn team_service.asgi:application --port 8000
+
+Usage:
+    python benchmarks/async_concurrency.py \\
+        http://127.0.0.1:8000/api/teams/ http://127.0.0.1:8000/api/async/teams/ \\
+        --concurrency 1 16 64 256 --requests 1000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.http_load import percentile  # noqa: E402
+
+
+async def timed_get(url):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    started = time.perf_counter()
+
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+
+    return status, time.perf_counter() - started
+
+
+async def run(url, requests, concurrency):
+    queue = iter(range(requests))
+    results = []
+
+    async def client():
+        for _ in queue:
+            results.append(await timed_get(url))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for status, latency in results)
+
+    return {
+        "throughput": requests / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "errors": sum(1 for status, latency in results if status != 200),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        for url in args.urls:
+            result = asyncio.run(run(url, args.requests, concurrency))
+            print(
+                f"{concurrency:>4} clients {url}: "
+                f"{result['throughput']:7.1f} req/s, "
+                f"p50 {result['p50'] * 1000:7.1f} ms, "
+                f"p99 {result['p99'] * 1000:7.1f} ms, "
+                f"errors {result['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure the per-request cost of opening database connections.
+
+Simulates request cycles (request_started, one small query, request_finished)
+with connections closed after every request and with persistent connections.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=team_service.settings \\
+        python benchmarks/connection_overhead.py --requests 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "team_service.settings")
+django.setup()
+
+from django.core.signals import request_started, request_finished  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from teams.models import Team  # noqa: E402
+
+
+def simulate_requests(requests, conn_max_age):
+    connection.close()
+    connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+    latencies = []
+
+    for _ in range(requests):
+        started = time.perf_counter()
+
+        request_started.send(sender=None)
+        list(Team.objects.only("id", "name")[:5])
+        request_finished.send(sender=None)
+
+        latencies.append(time.perf_counter() - started)
+
+    connection.close()
+
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--conn-max-age", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"vendor: {connection.vendor}")
+
+    for label, conn_max_age in (
+        ("new connection per request", 0),
+        (f"persistent (CONN_MAX_AGE={args.conn_max_age})", args.conn_max_age),
+    ):
+        latencies = sorted(simulate_requests(args.requests, conn_max_age))
+
+        print(
+            f"{label:>32}: mean {statistics.mean(latencies) * 1000:.2f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
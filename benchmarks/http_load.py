@@ -0,0 +1,65 @@
+"""
+Minimal HTTP load generator for comparing server setups.
+
+Usage:
+    python benchmarks/http_load.py http://127.0.0.1:8000/api/teams/ \
+        --requests 2000 --concurrency 16
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+
+def timed_get(url):
+    started = time.perf_counter()
+
+    with urlopen(url) as response:
+        response.read()
+        status = response.status
+
+    return status, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(url, requests, concurrency):
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_get, [url] * requests))
+
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for status, latency in results)
+    errors = sum(1 for status, latency in results if status != 200)
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    result = run(args.url, args.requests, args.concurrency)
+
+    for key, value in result.items():
+        print(f"{key:>12}: {value:.1f}" if isinstance(value, float) else f"{key:>12}: {value}")
+
+
+if __name__ == "__main__":
+    main()
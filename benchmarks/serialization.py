@@ -0,0 +1,79 @@
+"""
+Measure serialising and rendering a list of people to JSON.
+
+Builds unsaved Person rows with their team, serialises them with
+PersonListSerializer and renders the result with DRF's JSONRenderer
+and with FastJSONRenderer. No database is needed.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=team_service.settings \\
+        python benchmarks/serialization.py --rows 10000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "team_service.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from teams.models import Person, Team  # noqa: E402
+from teams.renderers import FastJSONRenderer, orjson  # noqa: E402
+from teams.serializers import PersonListSerializer  # noqa: E402
+
+
+def build_people(rows):
+    teams = [Team(id=number, name=f"Team {number}") for number in range(1, 101)]
+
+    return [
+        Person(
+            id=number,
+            first_name=f"First {number}",
+            last_name=f"Last {number}",
+            email=f"person{number}@example.com",
+            team=teams[number % len(teams)],
+        )
+        for number in range(1, rows + 1)
+    ]
+
+
+def timed(function, repeat):
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    people = build_people(args.rows)
+    data = PersonListSerializer(people, many=True).data
+
+    print(f"rows: {args.rows}, orjson: {orjson is not None}")
+    print(
+        f"{'serializer':>18}: "
+        f"{timed(lambda: PersonListSerializer(people, many=True).data, args.repeat):.1f} ms"
+    )
+
+    for renderer in (JSONRenderer(), FastJSONRenderer()):
+        milliseconds = timed(lambda: renderer.render(data), args.repeat)
+        print(f"{type(renderer).__name__:>18}: {milliseconds:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the serializer and the compiled values() path on read endpoints.
+
+Loads every person (list serializer) and every team with its members
+(detail serializer) from the configured database and renders them both
+ways, reporting rows per second. Run against a populated database.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=team_service.settings \\
+        python benchmarks/values_serializers.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "team_service.settings")
+django.setup()
+
+from teams.models import Person, Team  # noqa: E402
+from teams.serializers import (  # noqa: E402
+    PersonListSerializer,
+    TeamDetailSerializer,
+)
+from teams.views import member_prefetch  # noqa: E402
+
+
+def timed(function, repeat):
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+def compare(label, serializer_class, queryset, repeat):
+    plan = serializer_class().get_values_plan()
+    rows = queryset.count()
+
+    assert plan.render(plan.values(queryset)) == serializer_class(
+        queryset, many=True
+    ).data, f"{label}: outputs differ"
+
+    for path, function in (
+        ("serializer", lambda: serializer_class(queryset.all(), many=True).data),
+        ("values()", lambda: plan.render(plan.values(queryset))),
+    ):
+        seconds = timed(function, repeat)
+        print(
+            f"{label:>14} {path:>10}: {seconds * 1000:8.1f} ms, "
+            f"{rows / seconds:10.0f} rows/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    compare(
+        "people list",
+        PersonListSerializer,
+        Person.objects.select_related("team"),
+        args.repeat,
+    )
+    compare(
+        "team detail",
+        TeamDetailSerializer,
+        Team.objects.prefetch_related(member_prefetch(TeamDetailSerializer)),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
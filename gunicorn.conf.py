@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for serving team_service.asgi with uvicorn workers.
+
+Run with: gunicorn -c gunicorn.conf.py team_service.asgi:application
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Every worker is a single-threaded event loop, one per core plus spares
+# for workers blocked on synchronous ORM calls
+workers = int(
+    os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+# Use "sync" with team_service.wsgi:application to keep persistent database
+# connections (POSTGRES_CONN_MAX_AGE), ASGI workers should rely on pgbouncer
+# (the pgbouncer service of docker-compose.yml)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Restart workers periodically to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = "-"
+errorlog = "-"
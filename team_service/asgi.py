@@ -2,6 +2,8 @@
 ASGI config for team_service project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Team event streams (/api/teams/<id>/events/) are served by
+teams.streams.EventStreamRouter, every other request goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -9,8 +11,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "team_service.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from teams.streams import EventStreamRouter  # noqa: E402
+
+application = EventStreamRouter(
+    django_application, keepalive=settings.EVENTS_KEEPALIVE_SECONDS
+)
@@ -0,0 +1,255 @@
+"""
+Request metrics in the Prometheus text format.
+
+MetricsMiddleware records the wall time, database query count, database
+time and response size of every request, labelled by URL name and method,
+into in-process histograms served by metrics_view at /metrics. Queries
+slower than settings.METRICS_SLOW_QUERY_MS are logged with their SQL.
+When settings.METRICS_ENABLED is off the middleware removes itself from
+the chain, so requests pay nothing.
+
+Under ASGI sync views and the ORM calls of async views run in threads
+with their own connections. The recorder of the request is kept in a
+context variable, which sync_to_async copies into those threads, and
+process_view (run in the view thread) adds record_query to their
+connections.
+
+Every worker process keeps its own histograms, scrape each worker or run
+a single one when exact totals matter.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """Cumulative histogram per label set, safe to update from threads"""
+
+    def __init__(self, name, documentation, buckets, labels):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0, 0]
+
+            index = bisect_left(self.buckets, value)
+
+            if index < len(self.buckets):
+                series[0][index] += 1
+
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        with self.lock:
+            series = sorted(
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self.series.items()
+            )
+
+        for label_values, counts, total, count in series:
+            labels = format_labels(zip(self.labels, label_values))
+            cumulative = 0
+
+            for bucket, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{{{labels},le=\"{bucket}\"}} {cumulative}"
+                )
+
+            lines.append(f"{self.name}_bucket{{{labels},le=\"+Inf\"}} {count}")
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+
+        return lines
+
+
+def format_labels(pairs):
+    return ",".join(f'{name}="{escape(value)}"' for name, value in pairs)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Wall time of the request.",
+    DURATION_BUCKETS,
+    ("view", "method", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run by the request.",
+    QUERY_BUCKETS,
+    ("view", "method"),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time the request spent in database queries.",
+    DURATION_BUCKETS,
+    ("view", "method"),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body, streamed responses are left out.",
+    SIZE_BUCKETS,
+    ("view", "method"),
+)
+
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_QUERIES, REQUEST_DB_DURATION, RESPONSE_SIZE)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper counting queries and their time"""
+
+    def __init__(self, slow_query_seconds):
+        self.slow_query_seconds = slow_query_seconds
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+
+            if self.slow_query_seconds and elapsed >= self.slow_query_seconds:
+                logger.warning(
+                    "Slow query (%.1f ms) on %s: %s",
+                    elapsed * 1000,
+                    context["connection"].alias,
+                    sql,
+                )
+
+
+# QueryRecorder of the request being served, None outside requests
+current_recorder = ContextVar("current_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper that hands queries to the current recorder"""
+    recorder = current_recorder.get()
+
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder():
+    """Wrap the connections of the calling thread with record_query, once"""
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        install_recorder()
+        recorder = QueryRecorder(settings.METRICS_SLOW_QUERY_MS / 1000)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+
+        self.record(request, response, recorder, time.perf_counter() - started)
+
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(settings.METRICS_SLOW_QUERY_MS / 1000)
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+
+        self.record(request, response, recorder, time.perf_counter() - started)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """A sync hook, so an async chain calls it in the thread of the view"""
+        install_recorder()
+
+    @staticmethod
+    def record(request, response, recorder, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        method = request.method
+
+        REQUEST_DURATION.observe(elapsed, view, method, str(response.status_code))
+        REQUEST_QUERIES.observe(recorder.count, view, method)
+        REQUEST_DB_DURATION.observe(recorder.duration, view, method)
+
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), view, method)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, missing when metrics are disabled"""
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+
+    lines = [line for histogram in HISTOGRAMS for line in histogram.expose()]
+
+    return HttpResponse(
+        "\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,9 @@
+"""
+PostgreSQL backend with hooks that run right before a transaction commits.
+
+ENGINE "team_service.postgresql" behaves like django.db.backends.postgresql,
+with before_commit(func) added next to on_commit(func): the functions run in
+the transaction, after everything else it wrote, in the order they were
+registered. Like on_commit they are dropped with the savepoint or the
+transaction that registered them is rolled back.
+"""
@@ -0,0 +1,39 @@
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (savepoint ids, func) like run_on_commit
+        self.run_before_commit = []
+
+    def before_commit(self, func):
+        """Run func at the commit of the current transaction"""
+        if not self.in_atomic_block:
+            raise RuntimeError("before_commit() needs an atomic block.")
+
+        self.run_before_commit.append((set(self.savepoint_ids), func))
+
+    def commit(self):
+        hooks, self.run_before_commit = self.run_before_commit, []
+
+        # The outermost atomic block has ended, the hooks still run in its
+        # transaction as autocommit is only restored after the commit
+        for sids, func in hooks:
+            func()
+
+        super().commit()
+
+    def rollback(self):
+        self.run_before_commit = []
+        super().rollback()
+
+    def savepoint_rollback(self, sid):
+        super().savepoint_rollback(sid)
+        self.run_before_commit = [
+            (sids, func) for sids, func in self.run_before_commit if sid not in sids
+        ]
+
+    def close(self):
+        self.run_before_commit = []
+        super().close()
@@ -0,0 +1,124 @@
+"""
+Read replica routing.
+
+Reads of safe-method requests go to the replicas listed in
+settings.DATABASE_REPLICAS, everything else goes to the primary. Reads
+inside a transaction on the primary stay on it wherever they run, so the
+signal handlers of a write in a command or the shell read what it wrote.
+After a successful write the client gets a short-lived cookie that keeps
+its following reads on the primary, so it reads its own writes even while
+the replicas lag behind.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+PRIMARY = "default"
+STICKY_COOKIE = "use_primary"
+
+use_primary = ContextVar("use_primary", default=False)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the block to the primary"""
+    token = use_primary.set(True)
+
+    try:
+        yield
+    finally:
+        use_primary.reset(token)
+
+
+class ReplicaRoutingMiddleware:
+    """Works in sync and async chains, async views are not moved to a thread"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = self.process_request(request)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = self.process_request(request)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_primary.reset(token)
+
+        return self.process_response(request, response)
+
+    def process_request(self, request):
+        return use_primary.set(
+            request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+        )
+
+    def process_response(self, request, response):
+        is_write = request.method not in SAFE_METHODS
+
+        if is_write and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+
+        if (
+            not replicas
+            or use_primary.get()
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+
+        instance = hints.get("instance")
+
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Replicas receive the schema from the primary"""
+        return db not in settings.DATABASE_REPLICAS
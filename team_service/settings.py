@@ -53,7 +53,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "team_service.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "team_service.replicas.ReplicaRoutingMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -96,15 +98,83 @@ WSGI_APPLICATION = "team_service.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # django.db.backends.postgresql with pre-commit hooks, which write the
+        # change log last (see team_service/postgresql/__init__.py)
+        "ENGINE": "team_service.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Seconds to keep a connection open between requests, 0 closes it
+        # after every request. Only the threads of sync workers reuse it, ASGI
+        # deployments set 0 and pool in pgbouncer (see docker-compose.yml)
+        "CONN_MAX_AGE": int(os.getenv("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.getenv("POSTGRES_CONN_HEALTH_CHECKS", "True") == "True",
+        # Server-side cursors do not survive pgbouncer transaction pooling
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("POSTGRES_PGBOUNCER", "False") == "True",
     }
 }
 
+# Read replicas as comma separated host[:port] values, safe-method requests
+# read from them (see team_service/replicas.py)
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    host, _, port = replica.strip().partition(":")
+    alias = f"replica_{number}"
+
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["team_service.replicas.ReplicaRouter"]
+
+# Seconds a client keeps reading from the primary after one of its writes
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds to keep cached API list and detail responses, 0 disables the cache
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 0))
+
+API_CACHE_ALIAS = "default"
+
+# Render list and retrieve responses from .values() rows with compiled
+# serializers instead of model instances
+API_VALUES_SERIALIZERS = os.getenv("API_VALUES_SERIALIZERS", "False") == "True"
+
+# Request metrics served at /metrics, the middleware is skipped when off
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+
+# Log queries slower than this many milliseconds, 0 disables the log
+METRICS_SLOW_QUERY_MS = int(os.getenv("METRICS_SLOW_QUERY_MS", 200))
+
+
+# Broker of the team event streams: teams.events.LocalBroker reaches the
+# streams of its own process only, teams.events.PostgresBroker every worker
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "teams.events.LocalBroker")
+
+# Seconds between keepalive comments on idle event streams
+EVENTS_KEEPALIVE_SECONDS = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", 15))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -151,6 +221,16 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "teams.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "teams.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
 SPECTACULAR_SETTINGS = {
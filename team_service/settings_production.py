@@ -0,0 +1,32 @@
+"""
+Production settings for team_service project.
+
+Extends the development settings with DEBUG turned off, without the
+debug toolbar, which otherwise runs on every request, and with a JSON
+only renderer and parser set.
+"""
+import os
+
+from team_service.settings import *  # noqa: F401, F403
+from team_service.settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware != "debug_toolbar.middleware.DebugToolbarMiddleware"
+]
+
+STATIC_ROOT = BASE_DIR / "static"  # noqa: F405
+
+# JSON only: no browsable API, its content negotiation and form rendering
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["teams.renderers.FastJSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["teams.parsers.FastJSONParser"],
+}
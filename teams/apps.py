@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TeamsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "teams"
+
+    def ready(self):
+        import teams.lookups  # noqa: F401
+        import teams.signals  # noqa: F401
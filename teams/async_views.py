@@ -0,0 +1,185 @@
+"""
+Async read-only views for teams and people.
+
+They render the serializers of the sync viewsets, so the responses match
+/api/teams/ and /api/people/, but load rows with the async ORM and keep
+no worker thread busy while a slow client reads the response.
+"""
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from teams.filters import filter_teams, filter_people
+from teams.models import Team, Person
+from teams.pagination import ApiPagination, MembersPagination
+from teams.renderers import dumps
+from teams.serializers import (
+    TeamSerializer,
+    TeamDetailSerializer,
+    TeamDetailPaginatedSerializer,
+    PersonListSerializer,
+    PersonDetailSerializer,
+)
+from teams.views import SparseFieldsetViewMixin, member_prefetch, membership_prefetch
+
+
+class AsyncReadView(SparseFieldsetViewMixin, View):
+    """GET list (no pk) or retrieve (pk) rendered as JSON"""
+    queryset = None
+    serializer_classes = {}
+    pagination_class = ApiPagination
+
+    async def get(self, request, pk=None):
+        self.request = Request(request)
+        self.action = "list" if pk is None else "retrieve"
+
+        try:
+            if pk is None:
+                data = await self.list()
+            else:
+                data = await self.retrieve(pk)
+        except APIException as exc:
+            detail = exc.detail
+            data = detail if isinstance(detail, (list, dict)) else {"detail": detail}
+
+            return self.render(data, status=exc.status_code)
+
+        return self.render(data)
+
+    def render(self, data, status=200):
+        return HttpResponse(dumps(data), content_type="application/json", status=status)
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def filter_queryset(self, queryset):
+        return self.trim_queryset(queryset)
+
+    def get_serializer_class(self):
+        return self.serializer_classes[self.action]
+
+    def get_serializer(self, *args, **kwargs):
+        return self.get_serializer_class()(
+            *args, context={"request": self.request, "view": self}, **kwargs
+        )
+
+    async def fetch(self, queryset):
+        """aiterator() does not support prefetch_related() before Django 5.0"""
+        if queryset._prefetch_related_lookups:
+            return [instance async for instance in queryset]
+
+        return [instance async for instance in queryset.aiterator()]
+
+    async def list(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.pagination_class()
+        page_size = paginator.get_page_size(self.request)
+
+        count = await queryset.acount()
+        number = self.get_page_number(paginator, count, page_size)
+        offset = (number - 1) * page_size
+
+        results = self.get_serializer(
+            await self.fetch(queryset[offset:offset + page_size]), many=True
+        ).data
+
+        return {
+            "count": count,
+            "next": self.get_link(paginator, number + 1, count, page_size),
+            "previous": self.get_link(paginator, number - 1, count, page_size),
+            "results": results,
+        }
+
+    def get_page_number(self, paginator, count, page_size):
+        """Validate ?page= the way the sync PageNumberPagination does"""
+        pages = max(1, ceil(count / page_size))
+        number = self.request.query_params.get(paginator.page_query_param, 1)
+
+        if number in paginator.last_page_strings:
+            return pages
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise NotFound(paginator.invalid_page_message)
+
+        if not 1 <= number <= pages:
+            raise NotFound(paginator.invalid_page_message)
+
+        return number
+
+    def get_link(self, paginator, number, count, page_size):
+        if number < 1 or (number - 1) * page_size >= count:
+            return None
+
+        url = self.request.build_absolute_uri()
+
+        if number == 1:
+            return remove_query_param(url, paginator.page_query_param)
+
+        return replace_query_param(url, paginator.page_query_param, number)
+
+    async def get_object(self, pk):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        try:
+            return await queryset.aget(pk=pk)
+        except (ObjectDoesNotExist, TypeError, ValueError):
+            raise NotFound()
+
+    async def retrieve(self, pk):
+        return self.get_serializer(await self.get_object(pk)).data
+
+
+class AsyncTeamView(AsyncReadView):
+    queryset = Team.objects.all()
+    serializer_classes = {
+        "list": TeamSerializer,
+        "retrieve": TeamDetailSerializer,
+    }
+
+    def get_queryset(self):
+        queryset = filter_teams(super().get_queryset(), self.request.query_params)
+        prefetch = member_prefetch(self.get_serializer_class())
+
+        if prefetch:
+            queryset = queryset.prefetch_related(prefetch)
+
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == "retrieve" and MembersPagination.is_requested(self.request):
+            return TeamDetailPaginatedSerializer
+
+        return super().get_serializer_class()
+
+    async def retrieve(self, pk):
+        if not MembersPagination.is_requested(self.request):
+            return await super().retrieve(pk)
+
+        instance = await self.get_object(pk)
+
+        # The serializer queries the embedded members page itself
+        return await sync_to_async(lambda: self.get_serializer(instance).data)()
+
+
+class AsyncPersonView(AsyncReadView):
+    queryset = Person.objects.select_related("team")
+    serializer_classes = {
+        "list": PersonListSerializer,
+        "retrieve": PersonDetailSerializer,
+    }
+
+    def get_queryset(self):
+        queryset = filter_people(super().get_queryset(), self.request.query_params)
+
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(membership_prefetch())
+
+        return queryset
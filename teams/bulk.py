@@ -0,0 +1,400 @@
+import codecs
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import (
+    ParseError,
+    UnsupportedMediaType,
+    ValidationError,
+)
+
+from teams.hierarchy import add_teams, is_in_subtree, move_team
+from teams.models import Team, Person, Membership, Change
+from teams.serializers import (
+    PARENT_CYCLE_MESSAGE,
+    PersonImportSerializer,
+    TeamUpsertSerializer,
+)
+from teams.signals import deleting_teams_in_bulk, people_changed, teams_changed
+
+
+CSV_MEDIA_TYPES = ("text/csv",)
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def read_lines(stream):
+    """Decode the request body line by line without loading it in memory"""
+    if stream is None:
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    number = 0
+
+    try:
+        for number, line in enumerate(iter(stream.readline, b""), start=1):
+            yield decoder.decode(line)
+
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as error:
+        raise ParseError(f"Line {number} is not valid UTF-8: {error.reason}.")
+
+
+def parse_csv(lines):
+    """Yield (row number, row) pairs from CSV lines with a header row"""
+    reader = csv.DictReader(lines)
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def parse_ndjson(lines):
+    """Yield (row number, row) pairs from newline-delimited JSON objects"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+
+        yield number, row
+
+
+def parse_rows(request):
+    """Choose a row parser based on the request content type"""
+    media_type = request.content_type.split(";")[0].strip()
+    lines = read_lines(request.stream)
+
+    if media_type in CSV_MEDIA_TYPES:
+        return parse_csv(lines)
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        return parse_ndjson(lines)
+
+    raise UnsupportedMediaType(media_type)
+
+
+class PersonImporter:
+    """Validate and insert people in fixed-size chunks of rows"""
+    chunk_size = 1000
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        rows = iter(rows)
+
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.import_chunk(chunk)
+
+        return {"created": self.created, "errors": self.errors}
+
+    def import_chunk(self, chunk):
+        team_ids = self.get_team_ids(chunk)
+        taken_emails = self.get_taken_emails(chunk)
+        people = []
+
+        for number, row in chunk:
+            person, errors = self.build_person(row, team_ids, taken_emails)
+
+            if errors:
+                self.errors.append({"row": number, "errors": errors})
+                continue
+
+            taken_emails.add(person.email)
+            people.append((number, person))
+
+        if not people:
+            return
+
+        try:
+            with transaction.atomic():
+                created = Person.objects.bulk_create(
+                    person for number, person in people
+                )
+                people_changed.send(
+                    sender=Person,
+                    moves=[(person.id, None, person.team_id) for person in created],
+                    action=Change.CREATED,
+                )
+        except IntegrityError as error:
+            self.errors.extend(
+                {"row": number, "errors": {"non_field_errors": [str(error)]}}
+                for number, person in people
+            )
+        else:
+            self.created += len(people)
+
+    @staticmethod
+    def get_team_ids(chunk):
+        """Resolve every team name of the chunk with a single query"""
+        names = {
+            row["team"] for number, row in chunk
+            if isinstance(row, dict) and isinstance(row.get("team"), str)
+        }
+
+        return dict(Team.objects.filter(name__in=names).values_list("name", "id"))
+
+    @staticmethod
+    def get_taken_emails(chunk):
+        """Check email uniqueness for the whole chunk with a single query"""
+        emails = {
+            row["email"] for number, row in chunk
+            if isinstance(row, dict) and isinstance(row.get("email"), str)
+        }
+
+        return set(
+            Person.objects.filter(email__in=emails).values_list("email", flat=True)
+        )
+
+    @staticmethod
+    def build_person(row, team_ids, taken_emails):
+        if not isinstance(row, dict):
+            return None, {"non_field_errors": ["Row must be a JSON object."]}
+
+        serializer = PersonImportSerializer(data=row)
+        serializer.is_valid()
+        errors = dict(serializer.errors)
+
+        team_name = row.get("team")
+
+        if team_name is not None and not isinstance(team_name, str):
+            errors["team"] = ["Team must be a team name or null."]
+        elif team_name and team_name not in team_ids:
+            errors["team"] = [f"Team '{team_name}' does not exist."]
+
+        if serializer.validated_data.get("email") in taken_emails:
+            errors["email"] = ["person with this email already exists."]
+
+        if errors:
+            return None, errors
+
+        return Person(
+            **serializer.validated_data, team_id=team_ids.get(team_name)
+        ), None
+
+
+class TeamBulkWriter:
+    """
+    Upsert teams by name and delete teams by id in fixed-size batches,
+    each checked with a few queries and written in one transaction
+    """
+    batch_size = 1000
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ERROR = "error"
+
+    def __init__(self):
+        self.results = {"upsert": [], "delete": []}
+
+    def run(self, upsert=(), delete=()):
+        """Upserts go first, so a request can move teams out of the ones it deletes"""
+        upsert, delete = enumerate(upsert), enumerate(delete)
+
+        while batch := list(islice(upsert, self.batch_size)):
+            self.upsert_batch(batch)
+
+        while batch := list(islice(delete, self.batch_size)):
+            self.delete_batch(batch)
+
+        for results in self.results.values():
+            results.sort(key=lambda result: result["index"])
+
+        return self.results
+
+    def report(self, operation, index, status, **result):
+        self.results[operation].append({"index": index, "status": status, **result})
+
+    def fail(self, operation, index, errors):
+        self.report(operation, index, self.ERROR, errors=errors)
+
+    def upsert_batch(self, batch):
+        teams = self.validate_upserts(batch)
+
+        if not teams:
+            return
+
+        try:
+            with transaction.atomic():
+                written, cycles = self.write_upserts(teams)
+        except IntegrityError as error:
+            for index, team, status, moved in teams:
+                self.fail("upsert", index, {"non_field_errors": [str(error)]})
+        else:
+            for index, team, status in written:
+                self.report("upsert", index, status, id=team.id, name=team.name)
+
+            for index in cycles:
+                self.fail("upsert", index, {"parent": [PARENT_CYCLE_MESSAGE]})
+
+    def validate_upserts(self, batch):
+        """Return (index, team, status, moved) of the valid items"""
+        rows = []
+        # One serializer validates every item, its fields are only built once
+        serializer = TeamUpsertSerializer()
+
+        for index, item in batch:
+            try:
+                rows.append((index, serializer.run_validation(item)))
+            except ValidationError as error:
+                self.fail("upsert", index, error.detail)
+
+        if not rows:
+            return []
+
+        existing = {
+            name: (team_id, parent_id)
+            for name, team_id, parent_id in Team.objects.filter(
+                name__in={data["name"] for index, data in rows}
+            ).values_list("name", "id", "parent_id")
+        }
+        parents = set(
+            Team.objects.filter(
+                id__in={data["parent"] for index, data in rows if data.get("parent")}
+            ).values_list("id", flat=True)
+        )
+        teams, names = [], set()
+
+        for index, data in rows:
+            name = data["name"]
+            team_id, loaded_parent = existing.get(name, (None, None))
+            # Without a parent the team stays where it is
+            parent = data.get("parent", loaded_parent)
+
+            if name in names:
+                self.fail("upsert", index, {"name": ["Duplicate name in the request."]})
+            elif data.get("parent") is not None and parent not in parents:
+                self.fail(
+                    "upsert",
+                    index,
+                    {"parent": [f'Invalid pk "{parent}" - object does not exist.']},
+                )
+            else:
+                names.add(name)
+                status = self.CREATED if team_id is None else self.UPDATED
+                moved = status == self.UPDATED and parent != loaded_parent
+                teams.append(
+                    (index, Team(name=name, parent_id=parent), status, moved)
+                )
+
+        return teams
+
+    def write_upserts(self, teams):
+        """
+        Insert or bump every team with one statement, then move the existing
+        teams whose parent changed one by one, as each move can depend on
+        the hierarchy left by the previous ones. Return the written items
+        and the indexes of the moves that would have made a cycle
+        """
+        Team.objects.bulk_create(
+            [team for index, team, status, moved in teams],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["updated_at"],
+        )
+        # bulk_create only sets the primary key of inserted rows on some databases
+        ids = dict(
+            Team.objects.filter(
+                name__in=[team.name for index, team, status, moved in teams]
+            ).values_list("name", "id")
+        )
+        written, cycles = [], []
+
+        for index, team, status, moved in teams:
+            team.id = ids[team.name]
+
+            if moved and team.parent_id and is_in_subtree(team.parent_id, team.id):
+                cycles.append(index)
+                continue
+
+            if moved:
+                Team.objects.filter(id=team.id).update(parent_id=team.parent_id)
+                move_team(team)
+
+            written.append((index, team, status))
+
+        created = [team.id for index, team, status in written if status == self.CREATED]
+        updated = [team.id for index, team, status in written if status == self.UPDATED]
+        add_teams(created)
+
+        for teams, action in ((created, Change.CREATED), (updated, Change.UPDATED)):
+            if teams:
+                teams_changed.send(sender=Team, teams=teams, action=action)
+
+        return written, cycles
+
+    def delete_batch(self, batch):
+        existing = set(
+            Team.objects.filter(
+                id__in=[team_id for index, team_id in batch]
+            ).values_list("id", flat=True)
+        )
+        children = defaultdict(set)
+
+        for parent, team_id in Team.objects.filter(parent_id__in=existing).values_list(
+            "parent_id", "id"
+        ):
+            children[parent].add(team_id)
+
+        # A team with children that stay keeps them, so its own parent stays too
+        deleted = set(existing)
+
+        while kept := {team for team in deleted if children[team] - deleted}:
+            deleted -= kept
+
+        teams = {}
+
+        for index, team_id in batch:
+            if team_id not in existing:
+                self.fail("delete", index, {"id": ["Not found."]})
+            elif team_id not in deleted:
+                self.fail(
+                    "delete",
+                    index,
+                    {"id": ["The team has child teams, move or delete them first."]},
+                )
+            elif team_id in teams:
+                self.fail("delete", index, {"id": ["Duplicate id in the request."]})
+            else:
+                teams[team_id] = index
+
+        if not teams:
+            return
+
+        try:
+            with transaction.atomic():
+                self.write_deletes(list(teams))
+        except IntegrityError as error:
+            # Also RestrictedError, for a child team added since the check
+            for index in teams.values():
+                self.fail("delete", index, {"non_field_errors": [str(error)]})
+        else:
+            for team_id, index in teams.items():
+                self.report("delete", index, self.DELETED, id=team_id)
+
+    @staticmethod
+    def write_deletes(teams):
+        """
+        The collector deletes the memberships, the closure rows and the
+        teams and detaches the primary members with one statement per
+        table, the per-team handlers are skipped for a single teams_changed
+        """
+        members = list(
+            Membership.objects.filter(team_id__in=teams).values_list(
+                "team_id", "person_id"
+            )
+        )
+
+        with deleting_teams_in_bulk():
+            Team.objects.filter(id__in=teams).delete()
+
+        teams_changed.send(
+            sender=Team, teams=teams, action=Change.DELETED, members=members
+        )
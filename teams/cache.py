@@ -0,0 +1,156 @@
+from collections import Counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from team_service.replicas import primary_reads
+
+
+TEAM_LIST = "team-list"
+PERSON_LIST = "person-list"
+
+stats = Counter(hits=0, misses=0)
+
+
+def team_tag(team_id):
+    return f"team:{team_id}"
+
+
+def person_tag(person_id):
+    return f"person:{person_id}"
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_enabled():
+    return settings.API_CACHE_TIMEOUT > 0
+
+
+def _tag_key(tag):
+    return f"api:tag:{tag}"
+
+
+def _bump(tags):
+    get_cache().set_many(
+        {_tag_key(tag): uuid4().hex for tag in tags}, timeout=None
+    )
+
+
+def invalidate(*tags):
+    """
+    Give the tags new versions so every response cached against them
+    is stale. The tags are bumped again after commit, so a response
+    cached from a concurrent read of the old rows is dropped as well.
+    """
+    if not is_enabled() or not tags:
+        return
+
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def get_response(key):
+    """Return the cached response data, or None if missing or stale"""
+    entry = get_cache().get(f"api:response:{key}")
+
+    if entry is not None:
+        versions = get_cache().get_many(map(_tag_key, entry["versions"]))
+
+        if all(
+            versions.get(_tag_key(tag)) == version
+            for tag, version in entry["versions"].items()
+        ):
+            stats["hits"] += 1
+            return entry["data"]
+
+    stats["misses"] += 1
+
+    return None
+
+
+def get_versions(tags):
+    """Return the current version of each tag, creating missing ones"""
+    cache = get_cache()
+    stored = cache.get_many(map(_tag_key, tags))
+    versions = {}
+
+    for tag in tags:
+        version = stored.get(_tag_key(tag))
+
+        if version is None:
+            version = uuid4().hex
+
+            if not cache.add(_tag_key(tag), version, timeout=None):
+                version = cache.get(_tag_key(tag))
+
+        versions[tag] = version
+
+    return versions
+
+
+def set_response(key, data, versions):
+    """Cache response data against the tag versions read before building it"""
+    get_cache().set(
+        f"api:response:{key}",
+        {"versions": versions, "data": data},
+        timeout=settings.API_CACHE_TIMEOUT,
+    )
+
+
+class CacheResponseMixin:
+    """
+    Serve list and retrieve responses from the cache when enabled.
+    Tag versions are read before the response is built, so a write that
+    happens meanwhile leaves the new entry stale instead of wrong.
+    Responses to cache are read from the primary: a lagging replica could
+    return rows older than the tag versions and keep them cached.
+    """
+
+    def get_cache_key(self, request):
+        return f"{self.basename}:{self.action}:{request.build_absolute_uri()}"
+
+    def get_cache_tags(self):
+        """Tags known from the request alone"""
+        if self.action == "list":
+            return [f"{self.basename}-list"]
+
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+        return [f"{self.basename}:{lookup}"]
+
+    def get_data_cache_tags(self, data):
+        """Extra tags that can only be read from the response data"""
+        return []
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not is_enabled():
+            return handler(request, *args, **kwargs)
+
+        key = self.get_cache_key(request)
+        data = get_response(key)
+
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        versions = get_versions(self.get_cache_tags())
+
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            versions.update(get_versions(self.get_data_cache_tags(response.data)))
+            set_response(key, response.data, versions)
+            response["X-Cache"] = "MISS"
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
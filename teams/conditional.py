@@ -0,0 +1,49 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer If-None-Match / If-Modified-Since on retrieve with a 304
+    computed from one query over the validator fields, before the
+    object is loaded or serialized
+    """
+    validator_fields = ("updated_at",)
+
+    def get_validators(self):
+        """Return the (etag, last modified timestamp) pair or None if missing"""
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        row = (
+            self.queryset.model.objects.filter(**{self.lookup_field: lookup})
+            .values_list(*self.validator_fields)
+            .first()
+        )
+
+        if row is None:
+            return None
+
+        etag = hashlib.md5(repr(row).encode(), usedforsecurity=False).hexdigest()
+        last_modified = max(value for value in row if hasattr(value, "timestamp"))
+
+        return quote_etag(etag), int(last_modified.timestamp())
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_validators()
+
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+
+        return response
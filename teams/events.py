@@ -0,0 +1,241 @@
+"""
+Team membership events pushed to the server-sent events stream.
+
+The signals publish member_joined, member_left, team_renamed and
+team_deleted events to the broker named by settings.EVENTS_BROKER inside
+the writing transaction. Every process starts the broker once, on its
+first subscriber, and the FanOut hands each delivered event to the
+subscribers of that team, so all the streams of a process share one
+notification source:
+
+- LocalBroker delivers on commit within the process, for tests and
+  single worker servers;
+- PostgresBroker sends NOTIFY in the transaction and LISTENs on one
+  dedicated connection per process, so every worker sees every write.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+MEMBER_JOINED = "member_joined"
+MEMBER_LEFT = "member_left"
+TEAM_RENAMED = "team_renamed"
+TEAM_DELETED = "team_deleted"
+
+
+class Broker:
+    """Carries published events to the deliver callback of every process"""
+
+    def publish(self, events):
+        """Called inside the writing transaction with a list of event dicts"""
+        raise NotImplementedError
+
+    def start(self, deliver):
+        """Call deliver(events) from any thread for every committed publish"""
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    def __init__(self):
+        self.deliver = None
+
+    def publish(self, events):
+        if self.deliver is not None:
+            deliver = self.deliver
+            transaction.on_commit(lambda: deliver(events))
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+
+class PostgresBroker(Broker):
+    channel = "team_events"
+    # NOTIFY payloads are limited to 8000 bytes
+    max_payload = 7900
+
+    def publish(self, events):
+        with connection.cursor() as cursor:
+            for payload in self.payloads(events):
+                cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def payloads(self, events):
+        chunk = []
+        size = 2
+
+        for event in events:
+            encoded = json.dumps(event, separators=(",", ":"))
+
+            if chunk and size + len(encoded) + 1 > self.max_payload:
+                yield f"[{','.join(chunk)}]"
+                chunk, size = [], 2
+
+            chunk.append(encoded)
+            size += len(encoded) + 1
+
+        if chunk:
+            yield f"[{','.join(chunk)}]"
+
+    def start(self, deliver):
+        threading.Thread(target=self.listen, args=(deliver,), daemon=True).start()
+
+    def listen(self, deliver):
+        """
+        Runs for the life of the process: any failure is logged, a bad
+        notification is skipped and a broken connection is opened again
+        """
+        while True:
+            listener = None
+
+            try:
+                listener = self.connect()
+
+                while True:
+                    if select.select([listener], [], [], 60) == ([], [], []):
+                        continue
+
+                    listener.poll()
+
+                    while listener.notifies:
+                        self.dispatch(listener.notifies.pop(0).payload, deliver)
+
+            except Exception:
+                logger.exception("Team events listener failed, reconnecting")
+
+                if listener is not None:
+                    listener.close()
+
+                threading.Event().wait(5)
+
+    def connect(self):
+        import psycopg2
+
+        database = settings.DATABASES["default"]
+        listener = psycopg2.connect(
+            dbname=database["NAME"],
+            user=database["USER"],
+            password=database["PASSWORD"],
+            host=database["HOST"],
+            port=database["PORT"],
+        )
+        listener.autocommit = True
+        listener.cursor().execute(f"LISTEN {self.channel}")
+
+        return listener
+
+    @staticmethod
+    def dispatch(payload, deliver):
+        try:
+            deliver(json.loads(payload))
+        except Exception:
+            logger.exception("Team events listener dropped a notification")
+
+
+class Subscription:
+    """Events of one team for one stream, read from its event loop"""
+
+    def __init__(self, team_id, max_size):
+        self.team_id = team_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+        self.overflowed = False
+
+    def put(self, event):
+        """Runs on the subscription loop, a stream that falls behind is closed"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class FanOut:
+    """Hands events delivered by the broker to the subscribers of their team"""
+
+    def __init__(self, broker, max_queue=100):
+        self.broker = broker
+        self.max_queue = max_queue
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.started = False
+
+    def subscribe(self, team_id):
+        subscription = Subscription(team_id, self.max_queue)
+
+        with self.lock:
+            if not self.started:
+                self.broker.start(self.deliver)
+                self.started = True
+
+            self.subscriptions.setdefault(team_id, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.team_id, set())
+            subscriptions.discard(subscription)
+
+            if not subscriptions:
+                self.subscriptions.pop(subscription.team_id, None)
+
+    def deliver(self, events):
+        with self.lock:
+            targets = [
+                (subscription, event)
+                for event in events
+                for subscription in self.subscriptions.get(event["team"], ())
+            ]
+
+        for subscription, event in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The loop of a stream that is shutting down
+                self.unsubscribe(subscription)
+
+
+_fanout = None
+_fanout_lock = threading.Lock()
+
+
+def get_fanout():
+    global _fanout
+
+    with _fanout_lock:
+        if _fanout is None:
+            _fanout = FanOut(import_string(settings.EVENTS_BROKER)())
+
+    return _fanout
+
+
+def publish(events):
+    if events:
+        get_fanout().broker.publish(events)
+
+
+def membership_events(moves):
+    """member_left and member_joined events of (person, previous team, team) moves"""
+    events = []
+
+    for person, previous_team, team in moves:
+        if previous_team == team:
+            continue
+
+        if previous_team is not None:
+            events.append({"type": MEMBER_LEFT, "team": previous_team, "person": person})
+
+        if team is not None:
+            events.append({"type": MEMBER_JOINED, "team": team, "person": person})
+
+    return events
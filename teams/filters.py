@@ -0,0 +1,53 @@
+from rest_framework.exceptions import ValidationError
+
+from teams.hierarchy import subtree
+
+
+TEAM_ORDERING_FIELDS = ("id", "name", "member_count")
+
+
+def parse_count(query_params, name):
+    """
+    Read a non-negative integer parameter. isdigit() alone would accept
+    digits like "²" that int() rejects.
+    """
+    value = query_params[name]
+
+    if not (value.isascii() and value.isdecimal()):
+        raise ValidationError({name: ["A valid integer is required."]})
+
+    return int(value)
+
+
+def filter_teams(queryset, query_params):
+    """Apply ?name=, ?min_members=, ?ancestor= and ?ordering= to a team queryset"""
+    name = query_params.get("name")
+    min_members = query_params.get("min_members")
+    ancestor = query_params.get("ancestor")
+    ordering = query_params.get("ordering")
+
+    if name:
+        queryset = queryset.filter(name__trigram_contains=name)
+
+    if min_members:
+        min_members = parse_count(query_params, "min_members")
+        queryset = queryset.filter(member_count__gte=min_members)
+
+    if ancestor:
+        ancestor = parse_count(query_params, "ancestor")
+        queryset = queryset.filter(id__in=subtree(ancestor, include_self=False))
+
+    if ordering and ordering.lstrip("-") in TEAM_ORDERING_FIELDS:
+        queryset = queryset.order_by(ordering, "id")
+
+    return queryset
+
+
+def filter_people(queryset, query_params):
+    """Apply ?last_name= to a person queryset"""
+    last_name = query_params.get("last_name")
+
+    if last_name:
+        queryset = queryset.filter(last_name__trigram_contains=last_name)
+
+    return queryset
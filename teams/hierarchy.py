@@ -0,0 +1,100 @@
+"""
+Team hierarchy kept as a closure table.
+
+TeamClosure holds a row for every (ancestor, descendant) pair, so "every
+team under X" is one index range on (ancestor, descendant) whatever the
+depth. The signals keep it in sync with Team.parent: a new team copies
+the ancestor rows of its parent (one INSERT ... SELECT), a moved team
+swaps the ancestor rows of its whole subtree (one DELETE, one INSERT).
+Deleted teams lose their rows through the foreign key cascade, and
+Team.parent is RESTRICT so a team with children can not disappear alone.
+"""
+from django.db import connections
+
+from teams.models import Team, TeamClosure
+
+
+TABLE = TeamClosure._meta.db_table
+
+
+def subtree(team_id, include_self=True):
+    """Subquery of the ids of the team and every team under it"""
+    descendants = TeamClosure.objects.filter(ancestor_id=team_id)
+
+    if not include_self:
+        descendants = descendants.exclude(descendant_id=team_id)
+
+    return descendants.values("descendant_id")
+
+
+def is_in_subtree(team_id, root_id):
+    return TeamClosure.objects.filter(
+        ancestor_id=root_id, descendant_id=team_id
+    ).exists()
+
+
+def add_team(team, using="default"):
+    """The new team is its own ancestor and a descendant of its parent's ancestors"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TABLE} (ancestor_id, descendant_id, depth) "
+            f"SELECT ancestor_id, %s, depth + 1 FROM {TABLE} WHERE descendant_id = %s "
+            "UNION ALL SELECT %s, %s, 0",
+            [team.id, team.parent_id, team.id, team.id],
+        )
+
+
+def add_teams(team_ids, using="default"):
+    """add_team for many new teams, their parents already have their rows"""
+    if not team_ids:
+        return
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TABLE} (ancestor_id, descendant_id, depth) "
+            "WITH new (id, parent_id) AS ("
+            f"SELECT id, parent_id FROM {Team._meta.db_table} "
+            f"WHERE id IN ({', '.join(['%s'] * len(team_ids))})"
+            ") SELECT closure.ancestor_id, new.id, closure.depth + 1 "
+            f"FROM new JOIN {TABLE} closure ON closure.descendant_id = new.parent_id "
+            "UNION ALL SELECT id, id, 0 FROM new",
+            list(team_ids),
+        )
+
+
+def move_team(team, using="default"):
+    """Reattach the subtree of the team under its new parent"""
+    with connections[using].cursor() as cursor:
+        # Links from the old ancestors to every team of the subtree
+        cursor.execute(
+            f"DELETE FROM {TABLE} WHERE descendant_id IN "
+            f"(SELECT descendant_id FROM {TABLE} WHERE ancestor_id = %s) "
+            f"AND ancestor_id IN (SELECT ancestor_id FROM {TABLE} "
+            "WHERE descendant_id = %s AND ancestor_id != %s)",
+            [team.id, team.id, team.id],
+        )
+
+        if team.parent_id is not None:
+            cursor.execute(
+                f"INSERT INTO {TABLE} (ancestor_id, descendant_id, depth) "
+                "SELECT above.ancestor_id, below.descendant_id, "
+                "above.depth + below.depth + 1 "
+                f"FROM {TABLE} above, {TABLE} below "
+                "WHERE above.descendant_id = %s AND below.ancestor_id = %s",
+                [team.parent_id, team.id],
+            )
+
+
+def rebuild_closure(using="default"):
+    """Recompute every row from Team.parent, after writes that skipped the signals"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        cursor.execute(
+            f"INSERT INTO {TABLE} (ancestor_id, descendant_id, depth) "
+            "WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS ("
+            f"SELECT id, id, 0 FROM {Team._meta.db_table} "
+            "UNION ALL SELECT tree.ancestor_id, team.id, tree.depth + 1 "
+            f"FROM tree JOIN {Team._meta.db_table} team "
+            "ON team.parent_id = tree.descendant_id"
+            ") SELECT ancestor_id, descendant_id, depth FROM tree"
+        )
@@ -0,0 +1,20 @@
+from django.db.models import CharField
+from django.db.models.lookups import IContains
+
+
+@CharField.register_lookup
+class TrigramContains(IContains):
+    """
+    Case-insensitive substring match that PostgreSQL can serve from
+    a pg_trgm GIN index; other databases fall back to icontains
+    """
+    lookup_name = "trigram_contains"
+
+    def as_sql(self, compiler, connection):
+        return IContains(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+
+        return f"{lhs_sql} ILIKE {rhs_sql}", lhs_params + rhs_params
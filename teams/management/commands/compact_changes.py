@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from teams.models import Change
+
+
+class Command(BaseCommand):
+    """
+    Django command to drop the change log rows older than the retention
+    window that a later change of the same object supersedes, so reading
+    the feed from any sequence still ends at the latest state
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Keep every change of the last days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of changes checked per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days must not be negative")
+
+        batch_size = options["batch_size"]
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        superseded = Change.objects.filter(
+            object_type=OuterRef("object_type"),
+            object_id=OuterRef("object_id"),
+            id__gt=OuterRef("id"),
+        )
+
+        last_id = 0
+        deleted = 0
+
+        while True:
+            batch = list(
+                Change.objects.filter(id__gt=last_id, created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+
+            if not batch:
+                break
+
+            last_id = batch[-1]
+
+            with transaction.atomic():
+                count, _ = (
+                    Change.objects.filter(id__in=batch)
+                    .filter(Exists(superseded))
+                    .delete()
+                )
+
+            deleted += count
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} superseded change(s)"))
@@ -0,0 +1,173 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from teams import cache
+from teams.hierarchy import rebuild_closure
+from teams.models import Team, TeamClosure, Person, Membership
+from teams.search import rebuild_index
+
+
+FIRST_NAMES = (
+    "Alex", "Anna", "Ben", "Chloe", "Daniel", "Emma", "Ivan", "Julia",
+    "Liam", "Maria", "Noah", "Olga", "Peter", "Sofia", "Taras", "Zoe",
+)
+LAST_NAMES = (
+    "Adams", "Brown", "Clark", "Davis", "Evans", "Garcia", "Hughes", "Johnson",
+    "Kovalenko", "Lee", "Miller", "Novak", "Shevchenko", "Smith", "Taylor", "Wilson",
+)
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with reproducible benchmark data"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams", type=int, default=1000)
+        parser.add_argument("--people", type=int, default=1_000_000)
+        parser.add_argument(
+            "--unassigned",
+            type=float,
+            default=0.1,
+            help="Share of people without a team",
+        )
+        parser.add_argument(
+            "--departments",
+            type=int,
+            default=0,
+            help="Number of parent teams the teams are spread over",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Number of rows inserted per query",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete every team and person first",
+        )
+
+    def handle(self, *args, **options):
+        if options["teams"] < 1 or options["people"] < 0 or options["departments"] < 0:
+            raise CommandError(
+                "--teams must be positive, --people and --departments not negative"
+            )
+
+        if options["clear"]:
+            # One DELETE per table: the collector would run the delete
+            # signals, and log, row by row. The search index is rebuilt below
+            with transaction.atomic():
+                Membership.objects.all().delete()
+                TeamClosure.objects.all().delete()
+
+                with connection.cursor() as cursor:
+                    for model in (Person, Team):
+                        cursor.execute(f"DELETE FROM {model._meta.db_table}")
+
+        elif Team.objects.exists() or Person.objects.exists():
+            raise CommandError("The database has data, run with --clear to replace it")
+
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            departments = Team.objects.bulk_create(
+                Team(name=f"Department {number}")
+                for number in range(1, options["departments"] + 1)
+            )
+
+        # bulk_create returns no ids on every backend, read them back
+        if departments and departments[0].id is None:
+            departments = list(Team.objects.order_by("id"))
+
+        with transaction.atomic():
+            team_ids = [
+                team.id
+                for team in Team.objects.bulk_create(
+                    (
+                        Team(
+                            name=f"Team {number}",
+                            parent=(
+                                departments[number % len(departments)]
+                                if departments else None
+                            ),
+                        )
+                        for number in range(1, options["teams"] + 1)
+                    ),
+                    batch_size=batch_size,
+                )
+            ]
+
+        # bulk_create returns no ids on every backend, read them back
+        if None in team_ids:
+            team_ids = list(
+                Team.objects.filter(name__startswith="Team ")
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+
+        counts = dict.fromkeys(team_ids, 0)
+        created = 0
+
+        while created < options["people"]:
+            size = min(batch_size, options["people"] - created)
+            people = []
+
+            for number in range(created + 1, created + size + 1):
+                team_id = (
+                    None if rng.random() < options["unassigned"]
+                    else rng.choice(team_ids)
+                )
+                people.append(
+                    Person(
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        email=f"person{number}@example.com",
+                        team_id=team_id,
+                    )
+                )
+
+                if team_id is not None:
+                    counts[team_id] += 1
+
+            with transaction.atomic():
+                Person.objects.bulk_create(people)
+
+            created += size
+            self.stdout.write(f"{created}/{options['people']} people")
+
+        # bulk_create skips the signals that keep memberships, member_count,
+        # search and the hierarchy in sync
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {Membership._meta.db_table} "
+                    "(team_id, person_id, role, joined_at) "
+                    f"SELECT team_id, id, %s, %s FROM {Person._meta.db_table} "
+                    "WHERE team_id IS NOT NULL",
+                    [
+                        Membership.MEMBER,
+                        connection.ops.adapt_datetimefield_value(timezone.now()),
+                    ],
+                )
+
+            teams = [
+                Team(id=team_id, member_count=count)
+                for team_id, count in counts.items()
+            ]
+            Team.objects.bulk_update(teams, ["member_count"], batch_size=batch_size)
+            rebuild_index()
+            rebuild_closure()
+
+        cache.invalidate(cache.TEAM_LIST, cache.PERSON_LIST)
+
+        summary = f"Created {len(team_ids)} team(s) and {created} person(s)"
+
+        if departments:
+            summary += f" under {len(departments)} department(s)"
+
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from teams import cache
+from teams.models import Team, Membership, Change
+from teams.signals import record_changes
+
+
+class Command(BaseCommand):
+    """Django command to recompute Team.member_count from the memberships"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of teams checked per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        members = Coalesce(
+            Subquery(
+                Membership.objects.filter(team=OuterRef("pk"))
+                .order_by()
+                .values("team")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            Value(0),
+        )
+
+        last_id = 0
+        repaired = 0
+
+        while True:
+            batch = list(
+                Team.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+
+            if not batch:
+                break
+
+            last_id = batch[-1]
+
+            with transaction.atomic():
+                stale = list(
+                    Team.objects.select_for_update()
+                    .filter(id__in=batch)
+                    .annotate(actual=members)
+                    .exclude(member_count=F("actual"))
+                    .values_list("id", flat=True)
+                )
+
+                if stale:
+                    Team.objects.filter(id__in=stale).update(
+                        member_count=members, updated_at=timezone.now()
+                    )
+                    record_changes(
+                        *((Change.TEAM, team, Change.UPDATED) for team in stale)
+                    )
+                    cache.invalidate(
+                        cache.TEAM_LIST,
+                        cache.PERSON_LIST,
+                        *map(cache.team_tag, stale),
+                    )
+
+            repaired += len(stale)
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} team(s)"))
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = (
+    ("teams_team_name_trgm", "teams_team", "name"),
+    ("teams_person_first_name_trgm", "teams_person", "first_name"),
+    ("teams_person_last_name_trgm", "teams_person", "last_name"),
+    ("teams_person_email_trgm", "teams_person", "email"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN indexes are PostgreSQL only, other databases keep sequential scans"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for index, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for index, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("teams", "0004_alter_person_team"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("teams", "0005_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="person",
+            options={"ordering": ("id",)},
+        ),
+        migrations.AlterModelOptions(
+            name="team",
+            options={"ordering": ("id",)},
+        ),
+        migrations.AddField(
+            model_name="person",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_members(apps, schema_editor):
+    Team = apps.get_model("teams", "Team")
+    Person = apps.get_model("teams", "Person")
+
+    members = (
+        Person.objects.filter(team=OuterRef("pk"))
+        .order_by()
+        .values("team")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+
+    Team.objects.update(member_count=Coalesce(Subquery(members), Value(0)))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("teams", "0006_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="team",
+            index=models.Index(
+                fields=["member_count", "id"], name="team_member_count_idx"
+            ),
+        ),
+        migrations.RunPython(count_members, migrations.RunPython.noop),
+    ]
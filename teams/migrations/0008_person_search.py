@@ -0,0 +1,65 @@
+# Generated by Django 4.2.6 on 2026-10-18 18:46
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """A GIN indexed tsvector on PostgreSQL, an FTS5 table on SQLite"""
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "UPDATE teams_person SET search_vector = "
+            "setweight(to_tsvector('simple', first_name), 'A') || "
+            "setweight(to_tsvector('simple', last_name), 'A') || "
+            "setweight(to_tsvector('simple', email), 'B') || "
+            "setweight(to_tsvector('simple', COALESCE((SELECT name FROM teams_team "
+            "WHERE teams_team.id = teams_person.team_id), '')), 'C')"
+        )
+        schema_editor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS teams_person_search_idx "
+            "ON teams_person USING gin (search_vector)"
+        )
+
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS teams_person_fts USING fts5"
+            "(first_name, last_name, email, team_name, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO teams_person_fts (rowid, first_name, last_name, email, team_name) "
+            "SELECT person.id, person.first_name, person.last_name, person.email, "
+            "COALESCE(team.name, '') FROM teams_person person "
+            "LEFT JOIN teams_team team ON team.id = person.team_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS teams_person_search_idx")
+
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS teams_person_fts")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("teams", "0007_team_member_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="person",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
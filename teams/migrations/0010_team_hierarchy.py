@@ -0,0 +1,71 @@
+# Generated by Django 4.2.6 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def add_closure_rows(apps, schema_editor):
+    """Existing teams are roots, each only is its own ancestor"""
+    schema_editor.execute(
+        "INSERT INTO teams_teamclosure (ancestor_id, descendant_id, depth) "
+        "SELECT id, id, 0 FROM teams_team"
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("teams", "0009_change"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.RESTRICT,
+                related_name="children",
+                to="teams.team",
+            ),
+        ),
+        migrations.CreateModel(
+            name="TeamClosure",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField()),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="teams.team",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="teams.team",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="teamclosure",
+            constraint=models.UniqueConstraint(
+                fields=("ancestor", "descendant"), name="team_closure_unique"
+            ),
+        ),
+        migrations.RunPython(add_closure_rows, migrations.RunPython.noop),
+    ]
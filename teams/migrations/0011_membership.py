@@ -0,0 +1,119 @@
+# Generated by Django 4.2.6 on 2026-10-18 19:14
+
+from django.db import migrations, models, transaction
+from django.db.models import Max
+import django.db.models.deletion
+import django.utils.timezone
+
+
+BATCH_SIZE = 10_000
+
+
+def copy_primary_teams(apps, schema_editor):
+    """Every person with a team becomes its member, one transaction per id range"""
+    Person = apps.get_model("teams", "Person")
+    connection = schema_editor.connection
+    last_id = Person.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    joined_at = connection.ops.adapt_datetimefield_value(
+        django.utils.timezone.now()
+    )
+
+    for start in range(0, last_id, BATCH_SIZE):
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute(
+                "INSERT INTO teams_membership (team_id, person_id, role, joined_at) "
+                "SELECT team_id, id, %s, %s FROM teams_person "
+                "WHERE team_id IS NOT NULL AND id > %s AND id <= %s",
+                ["member", joined_at, start, start + BATCH_SIZE],
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("teams", "0010_team_hierarchy"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="person",
+            name="team",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="primary_members",
+                to="teams.team",
+            ),
+        ),
+        migrations.CreateModel(
+            name="Membership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("member", "Member"), ("lead", "Lead")],
+                        default="member",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "joined_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="teams.person",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="teams.team",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("person_id",),
+            },
+        ),
+        migrations.AddField(
+            model_name="person",
+            name="teams",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="members",
+                through="teams.Membership",
+                to="teams.team",
+            ),
+        ),
+        migrations.RunPython(copy_primary_teams, migrations.RunPython.noop),
+        # Indexed after the copy, building them once is cheaper than per row
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(fields=["person", "team"], name="membership_person_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="membership",
+            constraint=models.UniqueConstraint(
+                fields=("team", "person"), name="membership_unique"
+            ),
+        ),
+    ]
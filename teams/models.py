@@ -1,26 +1,159 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils import timezone
 
 
 class Team(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    # A team with child teams can only be deleted together with them
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.RESTRICT,
+        related_name="children",
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         ordering = ("id",)
+        indexes = [
+            models.Index(fields=("member_count", "id"), name="team_member_count_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """The signals write the change log, keep them in one transaction"""
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class TeamClosure(models.Model):
+    """
+    Every (ancestor, descendant) pair of the team hierarchy with its
+    distance, including each team with itself at depth 0, maintained by
+    teams.hierarchy
+    """
+    ancestor = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    descendant = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("ancestor", "descendant"), name="team_closure_unique"
+            ),
+        ]
+
+
+class PersonManager(models.Manager):
+    def get_queryset(self):
+        """The search vector is only read by the database"""
+        return super().get_queryset().defer("search_vector")
+
 
 class Person(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
+    # The primary team, the person is also a member of it through Membership
     team = models.ForeignKey(
-        Team, on_delete=models.SET_NULL, related_name="members", null=True, blank=True
+        Team,
+        on_delete=models.SET_NULL,
+        related_name="primary_members",
+        null=True,
+        blank=True,
     )
+    teams = models.ManyToManyField(
+        Team, through="Membership", related_name="members", blank=True
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by teams.search on PostgreSQL, SQLite uses an FTS5 table
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PersonManager()
 
     class Meta:
         ordering = ("id",)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
+
+    def save(self, *args, **kwargs):
+        """The signals write the change log, keep them in one transaction"""
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class Membership(models.Model):
+    """
+    A person in a team. Memberships of the primary team follow it through
+    sync_memberships in teams/signals.py, the other ones are added by
+    PersonMembershipSerializer.create and removed by
+    PersonViewSet.remove_membership
+    """
+    MEMBER = "member"
+    LEAD = "lead"
+
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="memberships", db_index=False
+    )
+    person = models.ForeignKey(
+        Person, on_delete=models.CASCADE, related_name="memberships", db_index=False
+    )
+    role = models.CharField(
+        max_length=10,
+        choices=((MEMBER, "Member"), (LEAD, "Lead")),
+        default=MEMBER,
+    )
+    joined_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("person_id",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=("team", "person"), name="membership_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=("person", "team"), name="membership_person_idx"),
+        ]
+
+    def __str__(self):
+        return str(self.person)
+
+
+class Change(models.Model):
+    """Append-only log of team and person writes, the id is the sequence"""
+    TEAM = "team"
+    PERSON = "person"
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    id = models.BigAutoField(primary_key=True)
+    object_type = models.CharField(
+        max_length=10, choices=((TEAM, "Team"), (PERSON, "Person"))
+    )
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(
+        max_length=10,
+        choices=((CREATED, "Created"), (UPDATED, "Updated"), (DELETED, "Deleted")),
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=("object_type", "object_id", "id"), name="change_object_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.id}: {self.action} {self.object_type} {self.object_id}"
@@ -1,7 +1,171 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+    _positive_int,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ApiCursorPagination(CursorPagination):
+    """Keyset pagination over the primary key, without COUNT or OFFSET"""
+    page_size = 5
+    ordering = "id"
+
+    def get_ordering(self, request, queryset, view):
+        """Keep an ordering chosen by the view, the primary key breaks ties"""
+        if queryset.query.order_by:
+            return tuple(queryset.query.order_by)
+
+        return super().get_ordering(request, queryset, view)
+
+    def decode_cursor(self, request):
+        """An empty cursor (?cursor=) selects the first page"""
+        if not request.query_params.get(self.cursor_query_param):
+            return None
+
+        return super().decode_cursor(request)
 
 
 class ApiPagination(PageNumberPagination):
     """Adding pagination to endpoint pages"""
     page_size = 5
     max_page_size = 100
+    cursor_pagination_class = ApiCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Switch to keyset pagination when the request passes ?cursor="""
+        cursor_paginator = self.cursor_pagination_class()
+
+        if cursor_paginator.cursor_query_param in request.query_params:
+            self.cursor_paginator = cursor_paginator
+            return cursor_paginator.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        cursor_parameters = self.cursor_pagination_class(
+        ).get_schema_operation_parameters(view)
+
+        return super().get_schema_operation_parameters(view) + [
+            parameter
+            for parameter in cursor_parameters
+            if parameter["name"] == self.cursor_pagination_class.cursor_query_param
+        ]
+
+
+class SearchPagination(PageNumberPagination):
+    """Page numbers only, keyset pagination can not seek on a rank"""
+    page_size = ApiPagination.page_size
+    max_page_size = ApiPagination.max_page_size
+
+
+class MembersPagination(ApiCursorPagination):
+    """Keyset pagination of the memberships nested in the team detail"""
+    cursor_query_param = "members_cursor"
+    page_size_query_param = "members_limit"
+    max_page_size = 100
+    ordering = "person_id"
+
+    def get_ordering(self, request, queryset, view):
+        return (self.ordering,)
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            cls.cursor_query_param in request.query_params
+            or cls.page_size_query_param in request.query_params
+        )
+
+
+class ChangeFeedPagination(BasePagination):
+    """Keyset pagination of the change log after the ?since= sequence"""
+    since_query_param = "since"
+    page_size_query_param = "limit"
+    page_size = 100
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.since = self.get_since(request)
+        limit = self.get_page_size(request)
+
+        changes = list(queryset.filter(id__gt=self.since).order_by("id")[: limit + 1])
+        self.has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            self.since = changes[-1].id
+
+        return changes
+
+    def get_since(self, request):
+        try:
+            return _positive_int(request.query_params.get(self.since_query_param, 0))
+        except ValueError:
+            raise ValidationError(
+                {self.since_query_param: ["A valid sequence number is required."]}
+            )
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_paginated_response(self, data):
+        """next always points after the last change, poll it for new ones"""
+        return Response(
+            {
+                "since": self.since,
+                "has_more": self.has_more,
+                "next": replace_query_param(
+                    self.request.build_absolute_uri(), self.since_query_param, self.since
+                ),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "since": {"type": "integer", "example": 123},
+                "has_more": {"type": "boolean"},
+                "next": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.since_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Return the changes after this sequence number.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of changes to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
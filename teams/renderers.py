@@ -0,0 +1,130 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+def _default(value):
+    """Types orjson does not know are encoded like DRF does"""
+    return JSONEncoder().default(value)
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON, with orjson when it is installed"""
+    if orjson is None:
+        content = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    else:
+        # Dates go through _default to keep DRF's format ("Z", milliseconds),
+        # list field errors are keyed by item index like json.dumps allows
+        content = orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+    # Keep the output a strict javascript subset, as JSONRenderer does
+    for separator, escaped in LINE_SEPARATORS:
+        if separator in content:
+            content = content.replace(separator, escaped)
+
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson, falls back to it for indented output"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
+
+
+class Echo:
+    """File-like object that returns written values instead of buffering them"""
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render rows as newline-delimited JSON objects"""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = [data]
+
+        return b"".join(self.render_rows(data or []))
+
+    def render_rows(self, rows, fields=None):
+        """Yield one encoded line per row"""
+        for row in rows:
+            yield dumps(row) + b"\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """Render rows as CSV with a header line, nested values are JSON encoded"""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = [data]
+
+        return "".join(self.render_rows(data or []))
+
+    def render_rows(self, rows, fields=None):
+        """Yield the header line and then one encoded line per row"""
+        writer = csv.writer(Echo())
+        rows = iter(rows)
+
+        if fields is None:
+            first = next(rows, None)
+
+            if first is None:
+                return
+
+            fields = list(first)
+            rows = _prepend(first, rows)
+
+        yield writer.writerow(fields)
+
+        for row in rows:
+            yield writer.writerow(
+                self.encode_value(row.get(field)) for field in fields
+            )
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+
+        return value
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
@@ -0,0 +1,169 @@
+"""
+Full-text search over people.
+
+PostgreSQL keeps a weighted tsvector in Person.search_vector (first and
+last name A, email B, the names of every team of the person C) behind a
+GIN index; SQLite keeps the same columns in the teams_person_fts FTS5
+table. Both are refreshed by reindex_people(), called from the signals on
+every write that changes a person, their memberships or a team name, with
+one query. Other databases fall back to icontains.
+"""
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from teams.models import Person, Membership
+
+
+FTS_TABLE = "teams_person_fts"
+
+# bm25 weights of the FTS5 columns, in table order
+FTS_WEIGHTS = (10.0, 10.0, 5.0, 2.0)
+
+# Names of the teams of the person, the primary team is one of its memberships
+FTS_TEAM_NAMES = (
+    "COALESCE((SELECT group_concat(team.name, ' ') FROM teams_membership membership "
+    "JOIN teams_team team ON team.id = membership.team_id "
+    "WHERE membership.person_id = person.id), '')"
+)
+
+TERM = re.compile(r"[\w.@+-]+")
+
+
+def parse_terms(query):
+    """Split the search text into terms safe to quote in both query syntaxes"""
+    return [term.strip(".@+-") for term in TERM.findall(query) if term.strip(".@+-")]
+
+
+def search_vector():
+    team_names = Subquery(
+        Membership.objects.filter(person_id=OuterRef("id"))
+        .values("person_id")
+        .annotate(names=StringAgg("team__name", " "))
+        .values("names")
+    )
+
+    return (
+        SearchVector("first_name", "last_name", weight="A", config="simple")
+        + SearchVector("email", weight="B", config="simple")
+        + SearchVector(Coalesce(team_names, Value("")), weight="C", config="simple")
+    )
+
+
+def reindex_people(person_ids=(), team_ids=()):
+    """Refresh the search data of the given people and of every member of the teams"""
+    if not person_ids and not team_ids:
+        return
+
+    if connection.vendor == "postgresql":
+        members = Membership.objects.filter(team_id__in=team_ids).values("person_id")
+        Person.objects.filter(Q(id__in=person_ids) | Q(id__in=members)).update(
+            search_vector=search_vector()
+        )
+
+    elif connection.vendor == "sqlite":
+        reindex_fts(list(person_ids), list(team_ids))
+
+
+def rebuild_index():
+    """Reindex every person, after writes that skipped the signals"""
+    if connection.vendor == "postgresql":
+        Person.objects.update(search_vector=search_vector())
+
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} "
+                "(rowid, first_name, last_name, email, team_name) "
+                "SELECT person.id, person.first_name, person.last_name, person.email, "
+                f"{FTS_TEAM_NAMES} FROM teams_person person"
+            )
+
+
+def placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def reindex_fts(person_ids, team_ids):
+    conditions = []
+
+    if person_ids:
+        conditions.append(f"person.id IN ({placeholders(person_ids)})")
+
+    if team_ids:
+        conditions.append(
+            "person.id IN (SELECT person_id FROM teams_membership "
+            f"WHERE team_id IN ({placeholders(team_ids)}))"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} "
+            "(rowid, first_name, last_name, email, team_name) "
+            "SELECT person.id, person.first_name, person.last_name, person.email, "
+            f"{FTS_TEAM_NAMES} FROM teams_person person "
+            f"WHERE {' OR '.join(conditions)}",
+            person_ids + team_ids,
+        )
+
+
+def unindex_people(person_ids):
+    """Drop the FTS5 rows of deleted people, the tsvector goes with the row"""
+    if person_ids and connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders(person_ids)})",
+                person_ids,
+            )
+
+
+def search_people(queryset, query):
+    """Filter the people matching every term of the query, best ranked first"""
+    terms = parse_terms(query)
+
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(
+            " & ".join(f"'{term}':*" for term in terms),
+            search_type="raw",
+            config="simple",
+        )
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        )
+
+    elif connection.vendor == "sqlite":
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(map(str, FTS_WEIGHTS))
+
+        # Joined rather than a correlated subquery, bm25() needs the MATCH
+        # in the same SELECT and is lower for better matches
+        queryset = queryset.extra(
+            select={"rank": f"-bm25({FTS_TABLE}, {weights})"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = teams_person.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        )
+
+    else:
+        for term in terms:
+            queryset = queryset.filter(
+                Q(first_name__icontains=term)
+                | Q(last_name__icontains=term)
+                | Q(email__icontains=term)
+                | Q(memberships__team__name__icontains=term)
+            )
+
+        # A person matches once per matching membership
+        queryset = queryset.distinct().annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    return queryset.order_by("-rank", "id")
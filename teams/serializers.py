@@ -1,39 +1,439 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from teams.hierarchy import is_in_subtree
+from teams.models import Team, Person, Membership, Change
+from teams.pagination import MembersPagination
+from teams.signals import people_changed, memberships_changed
+
+
+class SparseFieldsetMixin:
+    """
+    Render only the fields listed in ?fields= and not listed in ?omit=
+    on safe requests, and describe which columns and relations they read.
+    Names the serializer does not have are rejected with a 400
+    """
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get("request")
+
+        if request is None or request.method not in SAFE_METHODS:
+            return
+
+        self.validate_requested(request)
+
+        for name in list(self.fields):
+            if not self.is_field_requested(name):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_requested(cls, request, param):
+        value = request.query_params.get(param, "")
+
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @classmethod
+    def is_requested(cls, request):
+        return request.method in SAFE_METHODS and bool(
+            cls.get_requested(request, cls.fields_query_param)
+            or cls.get_requested(request, cls.omit_query_param)
+        )
+
+    def validate_requested(self, request):
+        errors = {}
+
+        for param in (self.fields_query_param, self.omit_query_param):
+            unknown = self.get_requested(request, param) - set(self.fields)
+
+            if unknown:
+                errors[param] = [
+                    f"Unknown fields: {', '.join(sorted(unknown))}. "
+                    f"Valid fields are: {', '.join(self.fields)}."
+                ]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+    def is_field_requested(self, name):
+        request = self.context.get("request")
+
+        if request is None or request.method not in SAFE_METHODS:
+            return True
+
+        requested = self.get_requested(request, self.fields_query_param)
+        omitted = self.get_requested(request, self.omit_query_param)
+
+        return (not requested or name in requested) and name not in omitted
+
+    def get_queryset_plan(self):
+        """
+        Return the (only, select_related, prefetch_related) lookups needed by
+        the rendered fields, or None when a field source can not be mapped
+        """
+        only, select_related, prefetch_related = set(), set(), set()
+
+        for field in self.fields.values():
+            path = field.source.split(".")
+
+            try:
+                model_field = self.Meta.model._meta.get_field(path[0])
+            except FieldDoesNotExist:
+                return None
+
+            if model_field.one_to_many or model_field.many_to_many:
+                prefetch_related.add(path[0])
+                continue
+
+            only.add(path[0])
+
+            if len(path) > 1:
+                select_related.add(path[0])
+                only.add("__".join(path))
+
+            elif isinstance(field, serializers.BaseSerializer):
+                select_related.add(path[0])
+                only.update(
+                    f"{path[0]}__{nested.source}" for nested in field.fields.values()
+                )
+
+        return only, select_related, prefetch_related
+
+
+class ValuesPlan:
+    """
+    Columns to read with .values() and the function turning one row into
+    the same dict the serializer renders, compiled once per field set
+    """
+
+    def __init__(self, lookups, steps, many):
+        self.lookups = lookups
+        self.many = many
+        self.to_dict = self.compile(steps)
+
+    def values(self, queryset):
+        """Rows of the queryset with the rendered columns and its ordering"""
+        pk = queryset.model._meta.pk.attname
+        ordering = [
+            field.lstrip("-")
+            for field in queryset.query.order_by
+            if isinstance(field, str)
+        ]
+
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys([pk, *self.lookups, *ordering])
+        )
+
+    def render(self, rows):
+        rows = list(rows)
+
+        for name, relation, plan in self.many:
+            pk = relation.model._meta.pk.attname
+            fk = relation.field.attname
+            related = defaultdict(list)
+
+            for row in relation.related_model.objects.filter(
+                **{f"{fk}__in": {row[pk] for row in rows}}
+            ).values(fk, *plan.lookups):
+                related[row[fk]].append(plan.to_dict(row))
+
+            for row in rows:
+                row[name, "many"] = related[row[pk]]
+
+        return [self.to_dict(row) for row in rows]
+
+    @staticmethod
+    def compile(steps):
+        """
+        Generate the row to dict function as straight-line code, one
+        assignment per field in the serializer order
+        """
+        namespace = {}
+        lines = ["def to_dict(row):", "    data = {}"]
+
+        for number, (name, kind, key, convert) in enumerate(steps):
+            converter = f"convert_{number}"
+            namespace[converter] = convert
+
+            if kind == "many":
+                value = f"row[{(name, kind)!r}]"
+            elif kind == "nested":
+                value = f"None if row[{key!r}] is None else {converter}(row)"
+            elif convert is None:
+                value = f"row[{key[-1]!r}]"
+            else:
+                lines.append(f"    value = row[{key[-1]!r}]")
+                value = f"value if value is None else {converter}(value)"
+
+            if kind == "related":
+                lines.append(f"    if row[{key[0]!r}] is not None:")
+                lines.append(f"        data[{name!r}] = {value}")
+            else:
+                lines.append(f"    data[{name!r}] = {value}")
+
+        lines.append("    return data")
+        exec("\n".join(lines), namespace)
+
+        return namespace["to_dict"]
+
+
+class ValuesSerializerMixin:
+    """
+    Opt-in fast path for read-only serializers: render .values() rows
+    without the per-field attribute lookups of to_representation
+    """
+    # Field types whose to_representation returns database values unchanged
+    identity_fields = (
+        serializers.CharField,
+        serializers.EmailField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+    )
+    identity_model_fields = (
+        models.CharField,
+        models.IntegerField,
+        models.BooleanField,
+    )
+
+    # Plans by (serializer class, prefix, rendered fields), shared by requests
+    values_plans = {}
+
+    def get_values_plan(self, prefix=""):
+        """Return a ValuesPlan, or None when a field can not be rendered from rows"""
+        key = (type(self), prefix, tuple(self.fields))
+
+        if key not in self.values_plans:
+            self.values_plans[key] = self.build_values_plan(prefix)
+
+        return self.values_plans[key]
+
+    def build_values_plan(self, prefix):
+        lookups, steps, many = [], [], []
+        opts = self.Meta.model._meta
+
+        for field in self._readable_fields:
+            name = field.field_name
+            path = field.source.split(".")
+
+            try:
+                model_field = opts.get_field(path[0])
+            except FieldDoesNotExist:
+                return None
+
+            if isinstance(field, serializers.ListSerializer):
+                plan = self._get_nested_plan(field.child, model_field, path)
+
+                if plan is None or prefix or not model_field.one_to_many:
+                    return None
+
+                many.append((name, model_field, plan))
+                steps.append((name, "many", None, None))
+
+            elif isinstance(field, serializers.BaseSerializer):
+                plan = self._get_nested_plan(
+                    field, model_field, path, prefix=f"{prefix}{path[0]}__"
+                )
+
+                if plan is None or plan.many or not model_field.many_to_one:
+                    return None
+
+                lookups.append(f"{prefix}{path[0]}")
+                lookups.extend(plan.lookups)
+                steps.append((name, "nested", f"{prefix}{path[0]}", plan.to_dict))
+
+            elif len(path) == 1 and not model_field.is_relation:
+                lookups.append(f"{prefix}{path[0]}")
+                steps.append(
+                    (name, "field", lookups[-1:], self._get_converter(field, model_field))
+                )
+
+            elif (
+                len(path) == 1
+                and model_field.many_to_one
+                and type(field) is serializers.PrimaryKeyRelatedField
+            ):
+                # The row already holds the related primary key
+                lookups.append(f"{prefix}{path[0]}")
+                steps.append((name, "field", lookups[-1:], None))
+
+            elif len(path) == 2 and model_field.many_to_one:
+                try:
+                    related_field = model_field.related_model._meta.get_field(path[1])
+                except FieldDoesNotExist:
+                    return None
 
-from teams.models import Team, Person
+                if related_field.is_relation:
+                    return None
 
+                # A missing related object leaves the field out, like DRF does
+                keys = (f"{prefix}{path[0]}", f"{prefix}{path[0]}__{path[1]}")
+                lookups.extend(keys)
+                steps.append(
+                    (name, "related", keys, self._get_converter(field, related_field))
+                )
 
-class PersonSerializer(serializers.ModelSerializer):
+            else:
+                return None
+
+        return ValuesPlan(lookups, steps, many)
+
+    @staticmethod
+    def _get_nested_plan(serializer, model_field, path, prefix=""):
+        if (
+            len(path) != 1
+            or not isinstance(serializer, ValuesSerializerMixin)
+            or serializer.Meta.model is not model_field.related_model
+        ):
+            return None
+
+        return serializer.get_values_plan(prefix=prefix)
+
+    def _get_converter(self, field, model_field):
+        if (
+            type(field) in self.identity_fields
+            and isinstance(model_field, self.identity_model_fields)
+        ):
+            return None
+
+        return field.to_representation
+
+
+class PersonSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
 
     class Meta:
         model = Person
         fields = ("id", "first_name", "last_name", "email")
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class PersonImportSerializer(PersonSerializer):
+    """Email uniqueness is checked per chunk by the bulk importer"""
+
+    class Meta(PersonSerializer.Meta):
+        extra_kwargs = {"email": {"validators": []}}
+
+
+PARENT_CYCLE_MESSAGE = "A team can not be moved under itself or its own descendants."
+
+
+class TeamSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     members = serializers.StringRelatedField(many=True, read_only=True)
 
     class Meta:
         model = Team
-        fields = ("id", "name", "members")
+        fields = ("id", "name", "parent", "member_count", "members")
+
+    def validate_parent(self, value):
+        """Moving a team under itself or one of its descendants would make a cycle"""
+        if value and self.instance and is_in_subtree(value.id, self.instance.id):
+            raise serializers.ValidationError(PARENT_CYCLE_MESSAGE)
+
+        return value
+
+
+class TeamUpsertSerializer(serializers.ModelSerializer):
+    """Name uniqueness, parents and moves are checked per batch by the bulk writer"""
+    parent = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Team
+        fields = ("name", "parent")
+        extra_kwargs = {"name": {"validators": []}}
+
+
+class TeamBulkSerializer(serializers.Serializer):
+    """Teams to upsert by name and ids to delete, items are reported one by one"""
+    upsert = serializers.ListField(
+        child=serializers.JSONField(), required=False, default=list
+    )
+    delete = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+
+class TeamListSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
+
+    class Meta:
+        model = Team
+        fields = ("id", "name", "parent", "member_count")
+
+
+class MemberSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
+    """A member of the team and their role in it, joined_at is on the person detail"""
+    id = serializers.IntegerField(source="person.id", read_only=True)
+    first_name = serializers.CharField(source="person.first_name", read_only=True)
+    last_name = serializers.CharField(source="person.last_name", read_only=True)
+    email = serializers.EmailField(source="person.email", read_only=True)
+
+    class Meta:
+        model = Membership
+        fields = ("id", "first_name", "last_name", "email", "role")
+        read_only_fields = ("role",)
+
+    # Columns read by the rendered fields, for .only() on membership querysets
+    only_fields = (
+        "team",
+        "role",
+        "person__id",
+        "person__first_name",
+        "person__last_name",
+        "person__email",
+    )
 
 
-class TeamListSerializer(serializers.ModelSerializer):
+class TeamDetailSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
+    members = MemberSerializer(source="memberships", many=True, read_only=True)
 
     class Meta:
         model = Team
-        fields = ("id", "name")
+        fields = ("id", "name", "parent", "members")
 
 
-class TeamDetailSerializer(serializers.ModelSerializer):
-    members = PersonSerializer(many=True, read_only=True)
+class TeamDetailPaginatedSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Team detail with one page of members and a link to the next page"""
 
     class Meta:
         model = Team
-        fields = ("id", "name", "members")
+        fields = ("id", "name", "parent")
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
 
-class PersonListSerializer(serializers.ModelSerializer):
+        if not self.is_field_requested("members"):
+            return data
+
+        paginator = MembersPagination()
+        members = paginator.paginate_queryset(
+            instance.memberships.select_related("person").only(
+                *MemberSerializer.only_fields
+            ),
+            self.context["request"],
+        )
+
+        data["members"] = MemberSerializer(members, many=True).data
+        data["members_next"] = paginator.get_next_link()
+
+        return data
+
+
+class PersonListSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
     team_name = serializers.CharField(source="team.name", read_only=True)
 
     class Meta:
@@ -41,16 +441,110 @@ class PersonListSerializer(serializers.ModelSerializer):
         fields = ("id", "first_name", "last_name", "email", "team_name")
 
 
-class PersonDetailSerializer(serializers.ModelSerializer):
+class PersonSearchSerializer(PersonListSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(PersonListSerializer.Meta):
+        fields = PersonListSerializer.Meta.fields + ("rank",)
+
+
+class PersonMembershipSerializer(ValuesSerializerMixin, serializers.ModelSerializer):
+    """A team of the person and their role in it"""
+    team_name = serializers.CharField(source="team.name", read_only=True)
+
+    class Meta:
+        model = Membership
+        fields = ("team", "team_name", "role", "joined_at")
+        read_only_fields = ("joined_at",)
+
+    # Columns read by the rendered fields, for .only() on membership querysets
+    only_fields = ("person", "team__name", "role", "joined_at")
+
+    def create(self, validated_data):
+        """Add the person to the team, or change their role if already a member"""
+        person = validated_data["person"]
+        team = validated_data["team"]
+        role = validated_data.get("role", Membership.MEMBER)
+
+        with transaction.atomic():
+            membership, created = Membership.objects.update_or_create(
+                person=person, team=team, defaults={"role": role}
+            )
+            # The memberships are part of the person representation
+            Person.objects.filter(id=person.id).update(updated_at=timezone.now())
+
+            memberships_changed.send(
+                sender=Membership,
+                moves=[(person.id, None if created else team.id, team.id)],
+            )
+
+        return membership
+
+
+class PersonDetailSerializer(
+    SparseFieldsetMixin, ValuesSerializerMixin, serializers.ModelSerializer
+):
     team = TeamListSerializer(many=False, read_only=True)
+    memberships = PersonMembershipSerializer(many=True, read_only=True)
 
     class Meta:
         model = Person
-        fields = ("id", "first_name", "last_name", "email", "team")
+        fields = ("id", "first_name", "last_name", "email", "team", "memberships")
 
 
-class AssignPersonToTeamSerializer(serializers.ModelSerializer):
+class AssignPersonToTeamSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Person
         fields = ("id", "team")
+
+
+class AssignPeopleToTeamSerializer(serializers.Serializer):
+    team = serializers.PrimaryKeyRelatedField(
+        queryset=Team.objects.all(), allow_null=True
+    )
+    people = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    def validate_people(self, value):
+        """Drop duplicated ids while keeping the request order"""
+        return list(dict.fromkeys(value))
+
+    def create(self, validated_data):
+        """Move all people with a single UPDATE, or nobody if any id is unknown"""
+        people = validated_data["people"]
+        team = validated_data["team"]
+
+        with transaction.atomic():
+            previous_teams = dict(
+                Person.objects.select_for_update()
+                .filter(id__in=people)
+                .values_list("id", "team_id")
+            )
+            unknown = [person for person in people if person not in previous_teams]
+
+            if unknown:
+                raise serializers.ValidationError(
+                    {"people": [f"Unknown person ids: {unknown}"]}
+                )
+
+            Person.objects.filter(id__in=people).update(
+                team=team, updated_at=timezone.now()
+            )
+
+            people_changed.send(
+                sender=Person,
+                moves=[
+                    (person, previous_teams[person], team and team.id)
+                    for person in people
+                ],
+            )
+
+        return validated_data
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Change
+        fields = ("id", "object_type", "object_id", "action", "created_at")
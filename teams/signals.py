@@ -0,0 +1,355 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from teams import cache, events
+from teams.hierarchy import add_team, move_team
+from teams.models import Team, Person, Membership, Change
+from teams.search import reindex_people, unindex_people
+
+
+# Sent by set-based writes that bypass Person.save(), with a
+# (person id, previous team id, team id) triple for every changed person
+# and the Change action to log for them (updated by default)
+people_changed = Signal()
+
+# Sent by writes to Membership, which has no model signals so that team
+# and person deletes cascade to it with a single DELETE, with a (person id,
+# team left, team joined) triple for every changed membership, the team
+# twice when only the membership or the person changed
+memberships_changed = Signal()
+
+# Sent by set-based writes that bypass Team.save() and Team.delete(), with
+# the ids of the written teams, the Change action to log for them and, for
+# deletes, the (team id, person id) memberships the teams lost
+teams_changed = Signal()
+
+# Set by set-based team deletes, which send teams_changed for the whole
+# batch: the collector still sends the per-team delete signals
+team_deletes_in_bulk = ContextVar("team_deletes_in_bulk", default=False)
+
+
+# Key of the Postgres advisory lock that orders change log writers
+CHANGE_LOG_LOCK = 0x6368616E6765
+
+
+def lock_change_log(using):
+    """
+    Hold the change log until the transaction ends, so that writers take
+    their ids in commit order and the feed never passes an id that commits
+    later. SQLite writers already hold the database lock until they commit.
+
+    The lock is global, so it is the last one a transaction takes: rows are
+    locked by the writes and their handlers, and the change log only right
+    before the commit (see record_changes). A writer holding it never waits
+    for a row another writer locked first, which would deadlock
+    """
+    connection = connections[using]
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK])
+
+
+@contextmanager
+def deleting_teams_in_bulk():
+    """Skip the per-team delete handlers of the block"""
+    token = team_deletes_in_bulk.set(True)
+
+    try:
+        yield
+    finally:
+        team_deletes_in_bulk.reset(token)
+
+
+def record_changes(*changes):
+    """
+    Append (object type, object id, action) rows to the change log. In a
+    transaction on PostgreSQL the rows are kept until its commit, then
+    inserted under the change log lock with one INSERT per call
+    """
+    using = router.db_for_write(Change)
+    connection = connections[using]
+
+    if hasattr(connection, "before_commit") and commits_later(connection):
+        connection.before_commit(lambda: write_changes(using, changes))
+    else:
+        write_changes(using, changes)
+
+
+def commits_later(connection):
+    """
+    Whether the connection is in a transaction that will commit, TestCase
+    rolls back the blocks it wraps every test in
+    """
+    return connection.in_atomic_block and not connection.atomic_blocks[0]._from_testcase
+
+
+def write_changes(using, changes):
+    # The lock lasts until the commit, also for writes outside a transaction
+    with transaction.atomic(using=using, savepoint=False):
+        lock_change_log(using)
+        Change.objects.using(using).bulk_create(
+            Change(object_type=object_type, object_id=object_id, action=action)
+            for object_type, object_id, action in changes
+        )
+
+
+def update_teams(moves):
+    """
+    Apply the membership moves to the teams in a single UPDATE: bump
+    updated_at, as membership is part of the team representation, and
+    shift member_count by the number of people who joined or left
+    """
+    teams = {team for person, *move in moves for team in move} - {None}
+    deltas = Counter()
+
+    for person, previous_team, team in moves:
+        if previous_team != team:
+            deltas[previous_team] -= 1
+            deltas[team] += 1
+
+    deltas.pop(None, None)
+    changes = {"updated_at": timezone.now()}
+
+    if any(deltas.values()):
+        changes["member_count"] = F("member_count") + Case(
+            *(When(id=team, then=Value(delta)) for team, delta in deltas.items()),
+            default=Value(0),
+        )
+
+    if teams:
+        Team.objects.filter(id__in=teams).update(**changes)
+
+    return teams
+
+
+def sync_memberships(moves, created=False):
+    """
+    Mirror primary team moves in Membership: people leave their previous
+    team and join the new one unless they already are members. Return the
+    membership triples of the moved people, who also stay in their other
+    teams, and (person, None, None) for people without any team
+    """
+    people = list(dict.fromkeys(person for person, *move in moves))
+    teams = defaultdict(set)
+
+    # People created by the write have no memberships yet
+    if not created:
+        memberships = Membership.objects.filter(person_id__in=people)
+
+        for person, team in memberships.values_list("person_id", "team_id"):
+            teams[person].add(team)
+
+    left, joined = defaultdict(list), defaultdict(list)
+
+    for person, previous_team, team in moves:
+        if previous_team == team:
+            continue
+
+        if previous_team in teams[person]:
+            teams[person].discard(previous_team)
+            left[person].append(previous_team)
+
+        if team is not None and team not in teams[person]:
+            teams[person].add(team)
+            joined[person].append(team)
+
+    if left:
+        people_by_team = defaultdict(list)
+
+        for person, previous_teams in left.items():
+            for team in previous_teams:
+                people_by_team[team].append(person)
+
+        Membership.objects.filter(
+            Q(
+                *(
+                    Q(team_id=team, person_id__in=members)
+                    for team, members in people_by_team.items()
+                ),
+                _connector=Q.OR,
+            )
+        ).delete()
+
+    if joined:
+        Membership.objects.bulk_create(
+            Membership(person_id=person, team_id=team)
+            for person, new_teams in joined.items()
+            for team in new_teams
+        )
+
+    changes = []
+
+    for person in people:
+        changes.extend((person, team, None) for team in left[person])
+        changes.extend(
+            (person, None, team) if team in joined[person] else (person, team, team)
+            for team in sorted(teams[person])
+        )
+
+        if not left[person] and not teams[person]:
+            changes.append((person, None, None))
+
+    return changes
+
+
+@receiver(post_init, sender=Person)
+def remember_loaded_team(sender, instance, **kwargs):
+    """Keep the team a person was loaded with to know which team they left"""
+    instance._loaded_team_id = instance.__dict__.get("team_id")
+
+
+@receiver(post_init, sender=Team)
+def remember_loaded_name_and_parent(sender, instance, **kwargs):
+    """Keep the name and parent a team was loaded with to detect renames and moves"""
+    instance._loaded_name = instance.__dict__.get("name")
+    instance._loaded_parent_id = instance.__dict__.get("parent_id")
+
+
+@receiver(post_save, sender=Team)
+def team_changed(sender, instance, **kwargs):
+    cache.invalidate(
+        cache.TEAM_LIST, cache.PERSON_LIST, cache.team_tag(instance.id)
+    )
+
+
+@receiver(post_save, sender=Team)
+def team_saved(sender, instance, created, using, **kwargs):
+    """The team name is part of the search data of its members"""
+    if created:
+        add_team(instance, using)
+    else:
+        if instance.name != instance._loaded_name:
+            reindex_people(team_ids=[instance.id])
+
+        if instance.parent_id != instance._loaded_parent_id:
+            move_team(instance, using)
+
+    record_changes(
+        (Change.TEAM, instance.id, Change.CREATED if created else Change.UPDATED)
+    )
+
+    if not created and instance.name != instance._loaded_name:
+        events.publish(
+            [{"type": events.TEAM_RENAMED, "team": instance.id, "name": instance.name}]
+        )
+
+    instance._loaded_name = instance.name
+    instance._loaded_parent_id = instance.parent_id
+
+
+@receiver(pre_delete, sender=Team)
+def remember_members(sender, instance, **kwargs):
+    """Memberships go with a bare DELETE, keep the members for reindexing and the log"""
+    if team_deletes_in_bulk.get():
+        return
+
+    instance._member_ids = list(
+        instance.memberships.values_list("person_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    if team_deletes_in_bulk.get():
+        return
+
+    teams_changed_in_bulk(
+        sender,
+        [instance.id],
+        action=Change.DELETED,
+        members=[(instance.id, person) for person in instance._member_ids],
+    )
+
+
+@receiver(teams_changed, sender=Team)
+def teams_changed_in_bulk(sender, teams, action=Change.UPDATED, members=(), **kwargs):
+    people = list(dict.fromkeys(person for team, person in members))
+
+    if people:
+        # The cascades detach the members without saving them, bump their
+        # updated_at so Last-Modified moves as well
+        Person.objects.filter(id__in=people).update(updated_at=timezone.now())
+
+    reindex_people(person_ids=people)
+    record_changes(
+        *((Change.TEAM, team, action) for team in teams),
+        *((Change.PERSON, person, Change.UPDATED) for person in people),
+    )
+
+    if action == Change.DELETED:
+        events.publish(
+            events.membership_events(
+                [(person, team, None) for team, person in members]
+            )
+            + [{"type": events.TEAM_DELETED, "team": team} for team in teams]
+        )
+
+    cache.invalidate(cache.TEAM_LIST, cache.PERSON_LIST, *map(cache.team_tag, teams))
+
+
+@receiver(post_save, sender=Person)
+def person_saved(sender, instance, created, **kwargs):
+    previous_team = None if created else instance._loaded_team_id
+
+    people_changed_in_bulk(
+        sender,
+        [(instance.id, previous_team, instance.team_id)],
+        action=Change.CREATED if created else Change.UPDATED,
+    )
+
+    instance._loaded_team_id = instance.team_id
+
+
+@receiver(pre_delete, sender=Person)
+def remember_teams(sender, instance, **kwargs):
+    """Memberships go with a bare DELETE, keep the teams the person leaves"""
+    instance._team_ids = list(instance.memberships.values_list("team_id", flat=True))
+
+
+@receiver(post_delete, sender=Person)
+def person_deleted(sender, instance, **kwargs):
+    memberships_changed_in_bulk(
+        sender,
+        [(instance.id, team, None) for team in instance._team_ids]
+        or [(instance.id, None, None)],
+        action=Change.DELETED,
+    )
+    unindex_people([instance.id])
+
+
+@receiver(people_changed, sender=Person)
+def people_changed_in_bulk(sender, moves, action=Change.UPDATED, **kwargs):
+    memberships_changed_in_bulk(
+        sender,
+        sync_memberships(moves, created=action == Change.CREATED),
+        action=action,
+    )
+
+
+@receiver(memberships_changed, sender=Membership)
+def memberships_changed_in_bulk(sender, moves, action=Change.UPDATED, **kwargs):
+    teams = update_teams(moves)
+    people = list(dict.fromkeys(person for person, *move in moves))
+    reindex_people(person_ids=people)
+
+    # Membership is part of the team representation, so its teams changed too
+    record_changes(
+        *((Change.PERSON, person, action) for person in people),
+        *((Change.TEAM, team, Change.UPDATED) for team in teams),
+    )
+    events.publish(events.membership_events(moves))
+
+    cache.invalidate(
+        cache.TEAM_LIST,
+        cache.PERSON_LIST,
+        *map(cache.person_tag, people),
+        *map(cache.team_tag, teams),
+    )
@@ -0,0 +1,126 @@
+"""
+Server-sent events stream of a team, served next to Django by team_service.asgi.
+
+GET /api/teams/<id>/events/ keeps the connection open and writes every
+membership event of the team as it commits, with a comment line every
+settings.EVENTS_KEEPALIVE_SECONDS so proxies keep idle streams open. The
+stream bypasses the Django middleware, it only reads the public team id.
+"""
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from teams import events
+from teams.models import Team
+
+
+PATH = re.compile(r"^/api/teams/(?P<team_id>\d+)/events/$")
+
+
+async def send_response(send, status, body):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+async def send_chunk(send, body):
+    await send({"type": "http.response.body", "body": body, "more_body": True})
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+@sync_to_async
+def team_exists(team_id):
+    """Recycle the connection around the query as Django does around requests"""
+    close_old_connections()
+
+    try:
+        return Team.objects.filter(id=team_id).exists()
+    finally:
+        close_old_connections()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def team_events(scope, receive, send, team_id, keepalive):
+    if scope["method"] != "GET":
+        return await send_response(send, 405, {"detail": "Method not allowed."})
+
+    if not await team_exists(team_id):
+        return await send_response(send, 404, {"detail": "Not found."})
+
+    fanout = events.get_fanout()
+    subscription = fanout.subscribe(team_id)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send_chunk(send, b": connected\n\n")
+
+        while not subscription.overflowed:
+            next_event = asyncio.ensure_future(subscription.get(keepalive))
+            await asyncio.wait(
+                (next_event, disconnected), return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if disconnected.done():
+                next_event.cancel()
+                return
+
+            try:
+                event = next_event.result()
+            except asyncio.TimeoutError:
+                await send_chunk(send, b": keepalive\n\n")
+                continue
+
+            await send_chunk(send, format_event(event))
+
+            if event["type"] == events.TEAM_DELETED:
+                break
+
+        await send({"type": "http.response.body", "body": b""})
+
+    finally:
+        fanout.unsubscribe(subscription)
+        disconnected.cancel()
+
+
+class EventStreamRouter:
+    """ASGI application serving the event streams and passing the rest to Django"""
+
+    def __init__(self, application, keepalive=15):
+        self.application = application
+        self.keepalive = keepalive
+
+    async def __call__(self, scope, receive, send):
+        match = PATH.match(scope.get("path", "")) if scope["type"] == "http" else None
+
+        if match is None:
+            return await self.application(scope, receive, send)
+
+        await team_events(
+            scope, receive, send, int(match["team_id"]), self.keepalive
+        )
@@ -0,0 +1,100 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.tests.test_person_api import (
+    PERSON_URL,
+    sample_person,
+    detail_url as person_detail_url,
+)
+from teams.tests.test_team_api import TEAM_URL, sample_team, sample_members, detail_url
+
+
+ASYNC_TEAM_URL = reverse("teams:async-team-list")
+ASYNC_PERSON_URL = reverse("teams:async-person-list")
+
+
+def async_detail_url(basename, pk):
+    return reverse(f"teams:async-{basename}-detail", args=[pk])
+
+
+class AsyncReadViewTests(TestCase):
+    """The async views must answer like the sync viewsets"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.team = sample_team()
+        sample_team(name="Team 2")
+        sample_members(self.team, 6)
+        self.person = sample_person(team=self.team)
+        self.loner = sample_person(
+            first_name="Jane", last_name="Roe", email="jane.roe@gmail.com"
+        )
+
+    def get_both(self, sync_url, async_url, params=None):
+        expected = self.client.get(sync_url, params)
+        response = self.client.get(async_url, params)
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(expected.status_code, response.status_code)
+
+        return (
+            json.loads(expected.content),
+            json.loads(response.content.replace(b"/api/async/", b"/api/")),
+        )
+
+    def assertSameResponse(self, sync_url, async_url, params=None):
+        expected, data = self.get_both(sync_url, async_url, params)
+
+        self.assertEqual(expected, data)
+
+    def test_team_list(self):
+        for params in (
+            None,
+            {"page": 2},
+            {"page": "last"},
+            {"page": 9},
+            {"page": "x"},
+            {"name": "2"},
+            {"min_members": "x"},
+            {"ordering": "-member_count"},
+            {"fields": "id,members"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameResponse(TEAM_URL, ASYNC_TEAM_URL, params)
+
+    def test_team_detail(self):
+        for params in (None, {"omit": "members"}, {"members_limit": 2}):
+            with self.subTest(params=params):
+                self.assertSameResponse(
+                    detail_url(self.team.id),
+                    async_detail_url("team", self.team.id),
+                    params,
+                )
+
+    def test_person_list(self):
+        for params in (None, {"page": 2}, {"last_name": "roe"}, {"omit": "email"}):
+            with self.subTest(params=params):
+                self.assertSameResponse(PERSON_URL, ASYNC_PERSON_URL, params)
+
+    def test_person_detail(self):
+        for person in (self.person, self.loner):
+            with self.subTest(person=person):
+                self.assertSameResponse(
+                    person_detail_url(person.id),
+                    async_detail_url("person", person.id),
+                )
+
+    def test_missing_person(self):
+        response = self.client.get(async_detail_url("person", 0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Not found."})
+
+    def test_writes_are_not_allowed(self):
+        response = self.client.post(ASYNC_TEAM_URL, {"name": "Team 3"})
+
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from teams import cache as api_cache
+from teams.bulk import PersonImporter
+from teams.tests.test_person_api import (
+    PERSON_URL,
+    BULK_ASSIGN_URL,
+    sample_person,
+    detail_url as person_detail_url,
+    assign_url,
+)
+from teams.tests.test_team_api import TEAM_URL, sample_team, detail_url
+
+
+@override_settings(API_CACHE_TIMEOUT=60)
+class ResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.admin = APIClient()
+        self.admin.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        return response["X-Cache"], response.data
+
+    def test_repeated_list_is_served_from_cache(self):
+        sample_team()
+        hits = api_cache.stats["hits"]
+
+        self.assertEqual(self.get(TEAM_URL)[0], "MISS")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(TEAM_URL)[0], "HIT")
+
+        self.assertEqual(api_cache.stats["hits"], hits + 1)
+
+    def test_list_key_includes_filters_and_pages(self):
+        sample_team()
+        self.get(TEAM_URL)
+
+        self.assertEqual(self.get(TEAM_URL, {"name": "team"})[0], "MISS")
+        self.assertEqual(self.get(TEAM_URL, {"cursor": ""})[0], "MISS")
+
+    def test_team_save_invalidates_team_and_people(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        self.get(detail_url(team.id))
+        self.get(person_detail_url(person.id))
+        self.get(PERSON_URL)
+
+        self.admin.patch(detail_url(team.id), {"name": "Renamed"})
+
+        self.assertEqual(self.get(detail_url(team.id))[1]["name"], "Renamed")
+        self.assertEqual(
+            self.get(person_detail_url(person.id))[1]["team"]["name"], "Renamed"
+        )
+        self.assertEqual(self.get(PERSON_URL)[1]["results"][0]["team_name"], "Renamed")
+
+    def test_team_delete_invalidates_members_set_null(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        self.get(person_detail_url(person.id))
+
+        self.admin.delete(detail_url(team.id))
+
+        status, data = self.get(person_detail_url(person.id))
+
+        self.assertEqual(status, "MISS")
+        self.assertIsNone(data["team"])
+
+    def test_unrelated_write_keeps_detail_cached(self):
+        team = sample_team()
+        self.get(detail_url(team.id))
+
+        sample_team(name="Team 2")
+        sample_person()
+
+        self.assertEqual(self.get(detail_url(team.id))[0], "HIT")
+        self.assertEqual(self.get(TEAM_URL)[0], "MISS")
+
+    def test_assign_to_team_invalidates_old_and_new_team(self):
+        old_team = sample_team()
+        new_team = sample_team(name="Team 2")
+        person = sample_person(team=old_team)
+        self.get(detail_url(old_team.id))
+        self.get(detail_url(new_team.id))
+
+        self.admin.put(assign_url(person.id), {"team": new_team.id})
+
+        self.assertEqual(self.get(detail_url(old_team.id))[1]["members"], [])
+        self.assertEqual(len(self.get(detail_url(new_team.id))[1]["members"]), 1)
+
+    def test_bulk_assign_invalidates_people_and_teams(self):
+        old_team = sample_team()
+        new_team = sample_team(name="Team 2")
+        person = sample_person(team=old_team)
+        self.get(detail_url(old_team.id))
+        self.get(person_detail_url(person.id))
+
+        self.admin.put(
+            BULK_ASSIGN_URL,
+            {"team": new_team.id, "people": [person.id]},
+            format="json",
+        )
+
+        self.assertEqual(self.get(detail_url(old_team.id))[1]["members"], [])
+        self.assertEqual(
+            self.get(person_detail_url(person.id))[1]["team"]["id"], new_team.id
+        )
+
+    def test_bulk_import_invalidates_lists(self):
+        team = sample_team()
+        self.get(detail_url(team.id))
+        self.get(PERSON_URL)
+
+        PersonImporter().run([
+            (1, {"first_name": "A", "last_name": "B", "email": "a@b.com", "team": team.name})
+        ])
+
+        self.assertEqual(self.get(PERSON_URL)[1]["count"], 1)
+        self.assertEqual(len(self.get(detail_url(team.id))[1]["members"]), 1)
+
+    @override_settings(API_CACHE_TIMEOUT=0)
+    def test_disabled_cache(self):
+        sample_team()
+        self.client.get(TEAM_URL)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(TEAM_URL)
+
+        self.assertNotIn("X-Cache", response)
@@ -0,0 +1,309 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.bulk import PersonImporter
+from teams.models import Person, Change
+from teams.signals import record_changes
+from teams.tests.test_person_api import (
+    BULK_ASSIGN_URL,
+    sample_person,
+    assign_url,
+)
+from teams.tests.test_team_api import sample_team
+
+
+CHANGES_URL = reverse("teams:change-list")
+
+
+def changes(after=0):
+    return list(
+        Change.objects.filter(id__gt=after).values_list(
+            "object_type", "object_id", "action"
+        )
+    )
+
+
+def last_sequence():
+    return Change.objects.order_by("id").values_list("id", flat=True).last() or 0
+
+
+class ChangeLogTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+        self.team1 = sample_team()
+        self.team2 = sample_team(name="Team 2")
+
+    def test_team_writes(self):
+        self.assertEqual(
+            changes(),
+            [
+                (Change.TEAM, self.team1.id, Change.CREATED),
+                (Change.TEAM, self.team2.id, Change.CREATED),
+            ],
+        )
+        since = last_sequence()
+
+        self.team1.name = "Renamed"
+        self.team1.save()
+
+        self.assertEqual(changes(since), [(Change.TEAM, self.team1.id, Change.UPDATED)])
+
+    def test_person_writes_log_their_teams(self):
+        since = last_sequence()
+        person = sample_person(team=self.team1)
+
+        self.assertEqual(
+            changes(since),
+            [
+                (Change.PERSON, person.id, Change.CREATED),
+                (Change.TEAM, self.team1.id, Change.UPDATED),
+            ],
+        )
+        since = last_sequence()
+
+        response = self.client.put(assign_url(person.id), {"team": self.team2.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertCountEqual(
+            changes(since),
+            [
+                (Change.PERSON, person.id, Change.UPDATED),
+                (Change.TEAM, self.team1.id, Change.UPDATED),
+                (Change.TEAM, self.team2.id, Change.UPDATED),
+            ],
+        )
+        since = last_sequence()
+
+        Person.objects.get(id=person.id).delete()
+
+        self.assertEqual(
+            changes(since),
+            [
+                (Change.PERSON, person.id, Change.DELETED),
+                (Change.TEAM, self.team2.id, Change.UPDATED),
+            ],
+        )
+
+    def test_bulk_writes(self):
+        person = sample_person()
+        since = last_sequence()
+
+        response = self.client.put(
+            BULK_ASSIGN_URL, {"team": self.team1.id, "people": [person.id]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        PersonImporter().run(
+            [(1, {"first_name": "A", "last_name": "B", "email": "a@b.com"})]
+        )
+
+        self.assertEqual(
+            changes(since)[:2],
+            [
+                (Change.PERSON, person.id, Change.UPDATED),
+                (Change.TEAM, self.team1.id, Change.UPDATED),
+            ],
+        )
+        created = Person.objects.get(email="a@b.com")
+        self.assertEqual(changes(since)[2], (Change.PERSON, created.id, Change.CREATED))
+
+    def test_team_delete_logs_detached_members(self):
+        person = sample_person(team=self.team1)
+        since = last_sequence()
+
+        team_id = self.team1.id
+        self.team1.delete()
+
+        self.assertEqual(
+            changes(since),
+            [
+                (Change.TEAM, team_id, Change.DELETED),
+                (Change.PERSON, person.id, Change.UPDATED),
+            ],
+        )
+
+    def test_failed_write_logs_nothing(self):
+        sample_person(email="taken@example.com")
+        since = last_sequence()
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            sample_person(email="taken@example.com")
+
+        self.assertEqual(changes(since), [])
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.teams = [sample_team(name=f"Team {number}") for number in range(5)]
+
+    def test_keyset_pages(self):
+        response = self.client.get(CHANGES_URL, {"limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        sequences = [change["id"] for change in response.data["results"]]
+        self.assertEqual(len(sequences), 3)
+        self.assertTrue(response.data["has_more"])
+        self.assertEqual(response.data["since"], sequences[-1])
+        self.assertIn(f"since={sequences[-1]}", response.data["next"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            [change["object_id"] for change in response.data["results"]],
+            [team.id for team in self.teams[3:]],
+        )
+        self.assertFalse(response.data["has_more"])
+
+    def test_poll_without_new_changes(self):
+        since = last_sequence()
+
+        response = self.client.get(CHANGES_URL, {"since": since})
+
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["since"], since)
+
+    def test_change_fields(self):
+        response = self.client.get(CHANGES_URL, {"limit": 1})
+
+        self.assertEqual(
+            set(response.data["results"][0]),
+            {"id", "object_type", "object_id", "action", "created_at"},
+        )
+
+    def test_invalid_since(self):
+        for since in ("abc", "-1"):
+            response = self.client.get(CHANGES_URL, {"since": since})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_read_only(self):
+        response = self.client.post(CHANGES_URL, {})
+
+        self.assertIn(
+            response.status_code,
+            (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN),
+        )
+
+
+class CompactChangesTests(TestCase):
+    def test_keeps_latest_change_of_every_object(self):
+        team = sample_team()
+        other = sample_team(name="Team 2")
+
+        for name in ("A", "B", "C"):
+            team.name = name
+            team.save()
+
+        Change.objects.update(created_at=timezone.now() - timedelta(days=40))
+        team.name = "D"
+        team.save()
+        team.name = "E"
+        team.save()
+
+        out = StringIO()
+        call_command("compact_changes", days=30, batch_size=2, stdout=out)
+
+        self.assertIn("Deleted 4 superseded change(s)", out.getvalue())
+        self.assertEqual(
+            changes(),
+            [
+                (Change.TEAM, other.id, Change.CREATED),
+                (Change.TEAM, team.id, Change.UPDATED),
+                (Change.TEAM, team.id, Change.UPDATED),
+            ],
+        )
+
+
+class ChangeFeedOrderTests(TransactionTestCase):
+    def setUp(self) -> None:
+        # The test database name is only known once it is created
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Concurrent writers need a database file or server")
+
+        self.client = APIClient()
+
+    def poll(self, since):
+        response = self.client.get(CHANGES_URL, {"since": since})
+
+        return response.data["since"], [
+            change["object_id"] for change in response.data["results"]
+        ]
+
+    def test_lower_id_committed_after_a_higher_one(self):
+        recorded, commit = threading.Event(), threading.Event()
+
+        def write(object_id, wait=False):
+            try:
+                with transaction.atomic():
+                    record_changes((Change.TEAM, object_id, Change.CREATED))
+                    recorded.set()
+
+                    if wait:
+                        commit.wait(5)
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=write, args=(1, True))
+        first.start()
+        recorded.wait(5)
+        # Without the lock the second writer takes the next id and commits
+        # first, on PostgreSQL the first only takes its id when it commits
+        second = threading.Thread(target=write, args=(2,))
+        second.start()
+        second.join(0.5)
+
+        since, seen = self.poll(0)
+
+        commit.set()
+        first.join()
+        second.join()
+
+        since, more = self.poll(since)
+
+        self.assertCountEqual(seen + more, [1, 2])
+
+    def test_change_log_is_locked_at_the_commit(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("SQLite writers hold the database lock")
+
+        with transaction.atomic():
+            team = sample_team()
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                    "AND pid = pg_backend_pid()"
+                )
+                self.assertEqual(cursor.fetchone(), (0,))
+
+            self.assertEqual(changes(), [])
+
+        self.assertEqual(changes(), [(Change.TEAM, team.id, Change.CREATED)])
+
+    def test_rolled_back_savepoint_drops_its_changes(self):
+        with transaction.atomic():
+            record_changes((Change.TEAM, 1, Change.CREATED))
+
+            try:
+                with transaction.atomic():
+                    record_changes((Change.TEAM, 2, Change.CREATED))
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        self.assertEqual(changes(), [(Change.TEAM, 1, Change.CREATED)])
@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from teams.models import Team, Person, Change
+from teams.tests.test_team_api import sample_team
+
+
+def generate(**options):
+    out = StringIO()
+    call_command(
+        "generate_benchmark_data", teams=5, people=50, batch_size=20, stdout=out,
+        **options,
+    )
+
+    return out.getvalue()
+
+
+def snapshot():
+    return (
+        list(Team.objects.values_list("name", "member_count")),
+        list(Person.objects.values_list("first_name", "last_name", "email", "team__name")),
+    )
+
+
+class GenerateBenchmarkDataTests(TestCase):
+
+    def test_creates_teams_people_and_member_counts(self):
+        output = generate()
+
+        self.assertIn("Created 5 team(s) and 50 person(s)", output)
+        self.assertEqual(Person.objects.count(), 50)
+        self.assertEqual(
+            dict(Team.objects.values_list("id", "member_count")),
+            {
+                team.id: team.actual
+                for team in Team.objects.annotate(actual=Count("members"))
+            },
+        )
+
+    def test_same_seed_gives_same_data(self):
+        generate()
+        first = snapshot()
+
+        generate(clear=True)
+
+        self.assertEqual(snapshot(), first)
+
+    def test_clear_deletes_with_one_statement_per_table(self):
+        generate()
+        changes = Change.objects.count()
+
+        with CaptureQueriesContext(connection) as context:
+            generate(clear=True)
+
+        deletes = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith("DELETE")
+        ]
+
+        # Memberships, closure rows, people and teams, then the rebuilds of
+        # the search index and the closure table
+        self.assertEqual(len(deletes), 6)
+        self.assertEqual(Change.objects.count(), changes)
+        self.assertEqual(Person.objects.count(), 50)
+
+    def test_refuses_to_mix_with_existing_data(self):
+        sample_team()
+
+        with self.assertRaises(CommandError):
+            generate()
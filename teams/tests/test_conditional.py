@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.models import Team, Person
+from teams.tests.test_person_api import sample_person, detail_url as person_detail_url
+from teams.tests.test_team_api import sample_team, detail_url
+from teams.tests.test_team_bulk import BULK_URL
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = APIClient()
+        self.admin.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+
+    def test_retrieve_sets_validators(self):
+        team = sample_team()
+
+        response = self.client.get(detail_url(team.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+    def test_if_none_match_returns_not_modified_with_one_query(self):
+        team = sample_team()
+        sample_person(team=team)
+        etag = self.client.get(detail_url(team.id))["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(detail_url(team.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since_returns_not_modified(self):
+        team = sample_team()
+        last_modified = self.client.get(detail_url(team.id))["Last-Modified"]
+
+        response = self.client.get(
+            detail_url(team.id), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_membership_change_changes_team_etag(self):
+        team = sample_team()
+        etag = self.client.get(detail_url(team.id))["ETag"]
+
+        sample_person(team=team)
+
+        response = self.client.get(detail_url(team.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["members"]), 1)
+
+    def test_member_leaving_changes_team_etag(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        etag = self.client.get(detail_url(team.id))["ETag"]
+
+        person.team = None
+        person.save()
+
+        response = self.client.get(detail_url(team.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_team_rename_changes_person_etag(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        etag = self.client.get(person_detail_url(person.id))["ETag"]
+
+        team.name = "Renamed"
+        team.save()
+
+        response = self.client.get(
+            person_detail_url(person.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["team"]["name"], "Renamed")
+
+    def test_team_delete_changes_person_etag(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        etag = self.client.get(person_detail_url(person.id))["ETag"]
+
+        team.delete()
+
+        response = self.client.get(
+            person_detail_url(person.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["team"])
+
+    def test_team_delete_changes_person_last_modified(self):
+        for delete in (
+            lambda team: team.delete(),
+            lambda team: self.admin.post(
+                BULK_URL, {"delete": [team.id]}, format="json"
+            ),
+        ):
+            team = sample_team()
+            person = sample_person(team=team)
+            an_hour_ago = timezone.now() - timedelta(hours=1)
+            Team.objects.update(updated_at=an_hour_ago)
+            Person.objects.update(updated_at=an_hour_ago)
+            last_modified = self.client.get(person_detail_url(person.id))[
+                "Last-Modified"
+            ]
+
+            delete(team)
+
+            response = self.client.get(
+                person_detail_url(person.id), HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(response.data["team"])
+            person.delete()
+
+    def test_missing_object_returns_not_found(self):
+        response = self.client.get(detail_url(999), HTTP_IF_NONE_MATCH='"x"')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
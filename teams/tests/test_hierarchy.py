@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.hierarchy import rebuild_closure
+from teams.models import Team, TeamClosure
+from teams.tests.test_commands import generate
+from teams.tests.test_person_api import sample_person
+from teams.tests.test_team_api import TEAM_URL, sample_team, detail_url
+
+
+def all_members_url(team_id):
+    return reverse("teams:team-all-members", args=[team_id])
+
+
+def closure():
+    return set(
+        TeamClosure.objects.values_list("ancestor__name", "descendant__name", "depth")
+    )
+
+
+class HierarchyTests(TestCase):
+    """company > engineering > (platform, mobile), company > sales"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+        self.company = sample_team(name="company")
+        self.engineering = sample_team(name="engineering", parent=self.company)
+        self.platform = sample_team(name="platform", parent=self.engineering)
+        self.mobile = sample_team(name="mobile", parent=self.engineering)
+        self.sales = sample_team(name="sales", parent=self.company)
+
+    def test_closure_rows(self):
+        self.assertEqual(
+            closure(),
+            {
+                ("company", "company", 0),
+                ("engineering", "engineering", 0),
+                ("platform", "platform", 0),
+                ("mobile", "mobile", 0),
+                ("sales", "sales", 0),
+                ("company", "engineering", 1),
+                ("company", "sales", 1),
+                ("engineering", "platform", 1),
+                ("engineering", "mobile", 1),
+                ("company", "platform", 2),
+                ("company", "mobile", 2),
+            },
+        )
+
+    def test_move_subtree(self):
+        response = self.client.patch(
+            detail_url(self.engineering.id), {"parent": self.sales.id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        expected = closure()
+        rebuild_closure()
+
+        self.assertEqual(closure(), expected)
+        self.assertIn(("company", "platform", 3), expected)
+        self.assertIn(("sales", "mobile", 2), expected)
+
+        self.engineering.refresh_from_db()
+        self.engineering.parent = None
+        self.engineering.save()
+
+        self.assertNotIn(("company", "platform", 3), closure())
+        self.assertIn(("engineering", "platform", 1), closure())
+
+    def test_cycles_are_rejected(self):
+        for parent in (self.engineering, self.platform):
+            response = self.client.patch(
+                detail_url(self.engineering.id), {"parent": parent.id}
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("parent", response.data)
+
+    def test_filter_by_ancestor(self):
+        response = self.client.get(
+            TEAM_URL, {"ancestor": self.engineering.id, "fields": "name"}
+        )
+
+        self.assertEqual(
+            [team["name"] for team in response.data["results"]], ["platform", "mobile"]
+        )
+
+        for value in ("x", "²"):
+            response = self.client.get(TEAM_URL, {"ancestor": value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_all_members_in_one_query(self):
+        people = [
+            sample_person(email=f"{team.name}@example.com", team=team)
+            for team in (self.engineering, self.platform, self.mobile, self.sales)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                all_members_url(self.engineering.id), {"cursor": ""}
+            )
+
+        self.assertEqual(
+            [person["email"] for person in response.data["results"]],
+            [person.email for person in people[:3]],
+        )
+        self.assertEqual(response.data["results"][1]["team_name"], "platform")
+        # Team lookup, then the members of the whole subtree
+        self.assertEqual(len(context.captured_queries), 2)
+
+        response = self.client.get(all_members_url(self.company.id))
+        self.assertEqual(response.data["count"], 4)
+
+    def test_team_with_children_is_not_deleted(self):
+        response = self.client.delete(detail_url(self.engineering.id))
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(Team.objects.filter(id=self.engineering.id).exists())
+
+        self.client.delete(detail_url(self.platform.id))
+
+        self.assertNotIn(("company", "platform", 2), closure())
+
+
+class GeneratedHierarchyTests(TestCase):
+    def test_departments(self):
+        output = generate(departments=2)
+
+        self.assertIn("under 2 department(s)", output)
+        self.assertEqual(Team.objects.filter(parent=None).count(), 2)
+        self.assertEqual(TeamClosure.objects.count(), 7 + 5)
+
+        generate(departments=2, clear=True)
+
+        self.assertEqual(TeamClosure.objects.count(), 7 + 5)
@@ -0,0 +1,38 @@
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper
+from django.test import TestCase
+
+from teams.models import Team, Person
+
+
+def postgresql_sql(queryset):
+    postgresql = DatabaseWrapper({**connection.settings_dict, "NAME": "test"})
+    sql, params = queryset.query.get_compiler(connection=postgresql).as_sql()
+
+    return sql, params
+
+
+class TrigramContainsLookupTests(TestCase):
+
+    def test_filter_is_case_insensitive_substring_match(self):
+        Person.objects.create(first_name="John", last_name="McDonald")
+        Person.objects.create(first_name="Jane", last_name="Smith", email="j@s.com")
+
+        people = Person.objects.filter(last_name__trigram_contains="dOnAl")
+
+        self.assertEqual([person.last_name for person in people], ["McDonald"])
+
+    def test_wildcards_are_escaped(self):
+        Team.objects.create(name="Team_1")
+        Team.objects.create(name="Team 1")
+
+        teams = Team.objects.filter(name__trigram_contains="m_1")
+
+        self.assertEqual([team.name for team in teams], ["Team_1"])
+
+    def test_postgresql_uses_indexable_ilike(self):
+        sql, params = postgresql_sql(Team.objects.filter(name__trigram_contains="dev"))
+
+        self.assertIn('"teams_team"."name" ILIKE %s', sql)
+        self.assertNotIn("UPPER", sql)
+        self.assertEqual(params, ("%dev%",))
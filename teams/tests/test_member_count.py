@@ -0,0 +1,147 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.bulk import PersonImporter
+from teams.models import Team, Person
+from teams.tests.test_person_api import (
+    BULK_ASSIGN_URL,
+    sample_person,
+    assign_url,
+    detail_url as person_detail_url,
+)
+from teams.tests.test_team_api import TEAM_URL, sample_team, sample_members, detail_url
+
+
+def member_counts():
+    return dict(Team.objects.values_list("name", "member_count"))
+
+
+class MemberCountTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+        self.team1 = sample_team()
+        self.team2 = sample_team(name="Team 2")
+
+    def test_create_and_delete_person(self):
+        person = sample_person(team=self.team1)
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 0})
+
+        self.client.delete(person_detail_url(person.id))
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 0})
+
+    def test_update_person_without_team_change(self):
+        person = sample_person(team=self.team1)
+
+        self.client.patch(person_detail_url(person.id), {"last_name": "Smith"})
+
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 0})
+
+    def test_assign_to_team(self):
+        person = sample_person(team=self.team1)
+
+        self.client.put(assign_url(person.id), {"team": self.team2.id})
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 1})
+
+        self.client.put(assign_url(person.id), {"team": ""})
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 0})
+
+    def test_bulk_assign_to_team(self):
+        people = [
+            sample_person(email="a@gmail.com", team=self.team1),
+            sample_person(email="b@gmail.com", team=self.team2),
+            sample_person(email="c@gmail.com"),
+        ]
+
+        response = self.client.put(
+            BULK_ASSIGN_URL,
+            {"team": self.team2.id, "people": [person.id for person in people]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 3})
+
+    def test_bulk_import(self):
+        PersonImporter().run([
+            (1, {"first_name": "A", "last_name": "B", "email": "a@b.com", "team": "Team 2"}),
+            (2, {"first_name": "C", "last_name": "D", "email": "c@d.com", "team": "Team 2"}),
+        ])
+
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 2})
+
+    def test_team_delete_sets_people_free(self):
+        sample_person(team=self.team1)
+
+        self.client.delete(detail_url(self.team1.id))
+
+        self.assertEqual(member_counts(), {"Team 2": 0})
+        self.assertIsNone(Person.objects.get().team)
+
+    def test_list_shows_and_orders_by_member_count(self):
+        sample_person(email="a@gmail.com", team=self.team2)
+        sample_person(email="b@gmail.com", team=self.team2)
+
+        response = self.client.get(TEAM_URL, {"ordering": "-member_count"})
+
+        self.assertEqual(
+            [(team["name"], team["member_count"]) for team in response.data["results"]],
+            [("Team 2", 2), ("Team 1", 0)],
+        )
+
+    def test_ordering_with_cursor_pagination(self):
+        for number in range(6):
+            team = sample_team(name=f"Big {number}")
+            sample_person(email=f"user{number}@gmail.com", team=team)
+
+        response = self.client.get(TEAM_URL, {"ordering": "member_count", "cursor": ""})
+        names = [team["name"] for team in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        names += [team["name"] for team in response.data["results"]]
+
+        self.assertEqual(
+            names, ["Team 1", "Team 2"] + [f"Big {number}" for number in range(6)]
+        )
+
+    def test_filter_by_min_members(self):
+        sample_person(team=self.team2)
+
+        response = self.client.get(TEAM_URL, {"min_members": 1})
+
+        self.assertEqual(
+            [team["name"] for team in response.data["results"]], ["Team 2"]
+        )
+
+    def test_invalid_min_members(self):
+        # "²" is a digit int() rejects, "٣" one it reads as 3
+        for value in ("many", "-1", "²", "٣"):
+            response = self.client.get(TEAM_URL, {"min_members": value})
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_member_count_is_read_only(self):
+        response = self.client.patch(
+            detail_url(self.team1.id), {"member_count": 10}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(member_counts()["Team 1"], 0)
+
+    def test_repair_member_counts_command(self):
+        sample_members(self.team1, 3)
+        Team.objects.filter(id=self.team2.id).update(member_count=5)
+        out = StringIO()
+
+        call_command("repair_member_counts", batch_size=1, stdout=out)
+
+        self.assertEqual(member_counts(), {"Team 1": 3, "Team 2": 0})
+        self.assertIn("Repaired 2 team(s)", out.getvalue())
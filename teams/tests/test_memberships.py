@@ -0,0 +1,224 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.models import Team, Person, Membership
+from teams.tests.test_changes import changes, last_sequence
+from teams.tests.test_hierarchy import all_members_url
+from teams.tests.test_person_api import sample_person, assign_url, detail_url
+from teams.tests.test_team_api import (
+    sample_team,
+    sample_members,
+    detail_url as team_detail_url,
+)
+from teams.tests.utils import QueryCountMixin
+
+
+def memberships_url(person_id):
+    return reverse("teams:person-memberships", args=[person_id])
+
+
+def membership_url(person_id, team_id):
+    return reverse("teams:person-membership", args=[person_id, team_id])
+
+
+def member_counts():
+    return dict(Team.objects.values_list("name", "member_count"))
+
+
+def memberships(person):
+    return dict(person.memberships.values_list("team__name", "role"))
+
+
+class MembershipTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+        self.team1 = sample_team(name="Team 1")
+        self.team2 = sample_team(name="Team 2")
+        self.person = sample_person(team=self.team1)
+
+    def test_primary_team_is_a_membership(self):
+        self.assertEqual(memberships(self.person), {"Team 1": Membership.MEMBER})
+
+        person = Person.objects.get()
+        person.team = self.team2
+        person.save()
+
+        self.assertEqual(memberships(person), {"Team 2": Membership.MEMBER})
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 1})
+
+    def test_add_membership(self):
+        sequence = last_sequence()
+
+        response = self.client.post(
+            memberships_url(self.person.id),
+            {"team": self.team2.id, "role": Membership.LEAD},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["team_name"], "Team 2")
+        self.assertEqual(
+            memberships(self.person),
+            {"Team 1": Membership.MEMBER, "Team 2": Membership.LEAD},
+        )
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 1})
+        self.assertEqual(
+            changes(sequence),
+            [
+                ("person", self.person.id, "updated"),
+                ("team", self.team2.id, "updated"),
+            ],
+        )
+
+        # A second write only changes the role
+        self.client.post(memberships_url(self.person.id), {"team": self.team2.id})
+
+        self.assertEqual(memberships(self.person)["Team 2"], Membership.MEMBER)
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 1})
+
+    def test_add_membership_to_unknown_team(self):
+        response = self.client.post(memberships_url(self.person.id), {"team": 999})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("team", response.data)
+
+    def test_remove_membership(self):
+        self.client.post(memberships_url(self.person.id), {"team": self.team2.id})
+
+        response = self.client.delete(membership_url(self.person.id, self.team2.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(memberships(self.person), {"Team 1": Membership.MEMBER})
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 0})
+
+        response = self.client.delete(membership_url(self.person.id, self.team2.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_leaving_the_primary_team_clears_it(self):
+        response = self.client.delete(membership_url(self.person.id, self.team1.id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIsNone(Person.objects.get().team)
+        self.assertEqual(memberships(self.person), {})
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 0})
+
+    def test_primary_move_into_a_team_of_the_person(self):
+        self.client.post(
+            memberships_url(self.person.id),
+            {"team": self.team2.id, "role": Membership.LEAD},
+        )
+
+        response = self.client.put(assign_url(self.person.id), {"team": self.team2.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(memberships(self.person), {"Team 2": Membership.LEAD})
+        self.assertEqual(member_counts(), {"Team 1": 0, "Team 2": 1})
+
+    def test_deletes_leave_every_team(self):
+        other = sample_person(email="other@gmail.com", team=self.team2)
+        self.client.post(memberships_url(self.person.id), {"team": self.team2.id})
+        self.client.post(memberships_url(other.id), {"team": self.team1.id})
+
+        self.person.delete()
+
+        self.assertEqual(member_counts(), {"Team 1": 1, "Team 2": 1})
+
+        self.team1.delete()
+
+        self.assertEqual(memberships(other), {"Team 2": Membership.MEMBER})
+        self.assertEqual(Person.objects.get().team, self.team2)
+
+    def test_team_detail_lists_roles(self):
+        self.client.post(
+            memberships_url(self.person.id),
+            {"team": self.team2.id, "role": Membership.LEAD},
+        )
+
+        response = self.client.get(team_detail_url(self.team2.id))
+
+        self.assertEqual(
+            [(member["id"], member["role"]) for member in response.data["members"]],
+            [(self.person.id, Membership.LEAD)],
+        )
+
+    def test_person_detail_lists_teams(self):
+        self.client.post(memberships_url(self.person.id), {"team": self.team2.id})
+
+        response = self.client.get(detail_url(self.person.id))
+
+        self.assertEqual(response.data["team"]["name"], "Team 1")
+        self.assertEqual(
+            [membership["team_name"] for membership in response.data["memberships"]],
+            ["Team 1", "Team 2"],
+        )
+
+    def test_person_detail_etag_follows_memberships(self):
+        self.client.post(memberships_url(self.person.id), {"team": self.team2.id})
+        etag = self.client.get(detail_url(self.person.id))["ETag"]
+
+        self.client.delete(membership_url(self.person.id, self.team2.id))
+        response = self.client.get(detail_url(self.person.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_all_members_lists_people_once(self):
+        child = sample_team(name="Child", parent=self.team1)
+        self.client.post(memberships_url(self.person.id), {"team": child.id})
+
+        response = self.client.get(all_members_url(self.team1.id))
+
+        self.assertEqual(response.data["count"], 1)
+
+
+class MembershipQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.team = sample_team()
+        self.person = sample_person(team=self.team)
+
+    def add_teams(self, size):
+        teams = Team.objects.bulk_create(
+            Team(name=f"Team {self.person.id}.{Team.objects.count()}.{number}")
+            for number in range(size)
+        )
+        Membership.objects.bulk_create(
+            Membership(team=team, person=self.person) for team in teams
+        )
+
+    def test_team_detail_queries_are_constant(self):
+        self.assertConstantQueries(
+            team_detail_url(self.team.id),
+            lambda size: sample_members(self.team, size),
+        )
+
+    def test_person_detail_queries_are_constant(self):
+        self.assertConstantQueries(detail_url(self.person.id), self.add_teams)
+
+    def test_assign_to_team_queries_are_constant(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+        counts = []
+
+        # Moves back and forth between two teams, with more teams each time
+        for size, team in ((1, sample_team(name="Other")), (5, self.team)):
+            self.add_teams(size)
+
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.put(assign_url(self.person.id), {"team": team.id})
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from team_service import metrics
+from team_service.metrics import Histogram
+from teams.tests.test_async_views import ASYNC_PERSON_URL
+from teams.tests.test_person_api import PERSON_URL, sample_person
+from teams.tests.test_team_api import TEAM_URL, sample_team
+
+
+METRICS_URL = "/metrics"
+
+
+class HistogramTests(TestCase):
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test.", (1, 5), ("view",))
+
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value, "a")
+
+        self.assertEqual(
+            histogram.expose(),
+            [
+                "# HELP test_seconds Test.",
+                "# TYPE test_seconds histogram",
+                'test_seconds_bucket{view="a",le="1"} 2',
+                'test_seconds_bucket{view="a",le="5"} 3',
+                'test_seconds_bucket{view="a",le="+Inf"} 4',
+                'test_seconds_sum{view="a"} 14.5',
+                'test_seconds_count{view="a"} 4',
+            ],
+        )
+
+    def test_label_values_are_escaped(self):
+        histogram = Histogram("test_seconds", "Test.", (1,), ("view",))
+        histogram.observe(1, 'a"b\\c')
+
+        self.assertIn('view="a\\"b\\\\c"', histogram.expose()[2])
+
+
+@override_settings(METRICS_ENABLED=False)
+class MetricsDisabledTests(TestCase):
+
+    def test_metrics_endpoint_is_missing(self):
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_SLOW_QUERY_MS=200)
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        sample_person()
+
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+
+    def scrape(self):
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+        return response.content.decode()
+
+    def test_records_request_queries_and_size(self):
+        response = self.client.get(PERSON_URL)
+
+        body = self.scrape()
+        labels = 'view="api:person-list",method="GET"'
+
+        self.assertIn(
+            f'http_request_duration_seconds_count{{{labels},status="200"}} 1', body
+        )
+        self.assertIn(
+            f"http_request_db_queries_sum{{{labels}}} 2", body
+        )
+        self.assertIn(f"http_request_db_duration_seconds_count{{{labels}}} 1", body)
+        self.assertIn(
+            f"http_response_size_bytes_sum{{{labels}}} {len(response.content)}", body
+        )
+
+    def test_unmatched_requests_share_a_label(self):
+        self.client.get("/missing/")
+
+        self.assertIn('view="unmatched",method="GET",status="404"', self.scrape())
+
+    @override_settings(METRICS_SLOW_QUERY_MS=0.000001)
+    def test_slow_queries_are_logged(self):
+        with self.assertLogs("team_service.metrics", "WARNING") as logs:
+            self.client.get(PERSON_URL)
+
+        self.assertIn("Slow query", logs.output[0])
+        self.assertIn("teams_person", "".join(logs.output))
+
+
+@override_settings(
+    METRICS_ENABLED=True,
+    METRICS_SLOW_QUERY_MS=200,
+    # The middleware of the production settings, which all run async
+    MIDDLEWARE=[
+        middleware for middleware in settings.MIDDLEWARE
+        if not middleware.startswith("debug_toolbar")
+    ],
+)
+class AsgiMetricsTests(TransactionTestCase):
+    """
+    Requests served from an event loop of their own, as under an ASGI
+    server: sync views and ORM calls run in another thread, with its own
+    database connections
+    """
+
+    def setUp(self) -> None:
+        sample_team()
+        sample_person()
+
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+
+    @staticmethod
+    def get(url):
+        thread = threading.Thread(target=asyncio.run, args=(AsyncClient().get(url),))
+        thread.start()
+        thread.join()
+
+    def test_records_queries_of_sync_and_async_views(self):
+        self.get(TEAM_URL)
+        self.get(ASYNC_PERSON_URL)
+
+        body = "\n".join(metrics.REQUEST_QUERIES.expose())
+
+        for view, queries in (("api:team-list", 3), ("api:async-person-list", 2)):
+            self.assertIn(
+                f'http_request_db_queries_sum{{view="{view}",method="GET"}} {queries}',
+                body,
+            )
@@ -1,9 +1,13 @@
+import json
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from teams.bulk import PersonImporter
 from teams.models import Person
 from teams.pagination import ApiPagination
 from teams.serializers import PersonListSerializer, PersonDetailSerializer
@@ -11,6 +15,9 @@ from teams.tests.test_team_api import sample_team
 
 
 PERSON_URL = reverse("teams:person-list")
+BULK_URL = reverse("teams:person-bulk-import")
+EXPORT_URL = reverse("teams:person-export")
+BULK_ASSIGN_URL = reverse("teams:person-bulk-assign-to-team")
 
 
 def sample_person(**params):
@@ -64,6 +71,41 @@ class UnauthenticatedPersonApiTests(TestCase):
         self.assertNotContains(response, person2.last_name)
         self.assertNotContains(response, person3.last_name)
 
+    def test_list_people_with_cursor_pagination(self):
+        people = [
+            sample_person(email=f"user{number}@gmail.com") for number in range(7)
+        ]
+
+        response = self.client.get(PERSON_URL, {"cursor": "", "last_name": "doe"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(len(response.data["results"]), 5)
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            [person["id"] for person in response.data["results"]],
+            [person.id for person in people[5:]],
+        )
+
+    def test_export_people_ndjson(self):
+        team = sample_team()
+        person = sample_person(team=team)
+        sample_person(last_name="Smith", email="smith@gmail.com")
+
+        response = self.client.get(
+            EXPORT_URL, {"last_name": "doe"}, HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [PersonListSerializer(person).data],
+        )
+
     def test_retrieve_person_detail(self):
         person = sample_person()
 
@@ -96,6 +138,14 @@ class AuthenticatedPersonApiTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_bulk_import_forbidden(self):
+        body = "first_name,last_name,email\nJohn,Doe,john.doe@gmail.com\n"
+
+        response = self.client.post(BULK_URL, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Person.objects.exists())
+
 
 class AdminPersonApiTests(TestCase):
     def setUp(self) -> None:
@@ -168,3 +218,150 @@ class AdminPersonApiTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(person.team.id, team.id)
+
+    def test_bulk_import_csv(self):
+        team = sample_team()
+        body = (
+            "first_name,last_name,email,team\n"
+            "John,Doe,john.doe@gmail.com,Team 1\n"
+            "Jane,Doe,jane.doe@gmail.com,\n"
+        )
+
+        response = self.client.post(BULK_URL, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"created": 2, "errors": []})
+        self.assertEqual(
+            Person.objects.get(email="john.doe@gmail.com").team_id, team.id
+        )
+        self.assertIsNone(Person.objects.get(email="jane.doe@gmail.com").team_id)
+
+    def test_bulk_import_ndjson_reports_row_errors(self):
+        sample_person()
+        body = "\n".join([
+            '{"first_name": "Jane", "last_name": "Doe", "email": "jane@gmail.com"}',
+            '{"first_name": "John", "last_name": "Doe", "email": "john.doe@gmail.com"}',
+            '{"first_name": "Ann", "last_name": "Lee", "email": "jane@gmail.com"}',
+            '{"first_name": "Bob", "last_name": "Lee", "email": "not-an-email"}',
+            '{"first_name": "Tom", "last_name": "Lee", "email": "t@gmail.com", "team": "Nope"}',
+            "not json",
+        ])
+
+        response = self.client.post(
+            BULK_URL, body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            [(error["row"], sorted(error["errors"])) for error in response.data["errors"]],
+            [
+                (2, ["email"]),
+                (3, ["email"]),
+                (4, ["email"]),
+                (5, ["team"]),
+                (6, ["non_field_errors"]),
+            ],
+        )
+        self.assertEqual(Person.objects.count(), 2)
+
+    def test_bulk_import_reports_team_that_is_not_a_name(self):
+        sample_team()
+        teams = ([], {}, 1, None, "Team 1")
+        body = "\n".join(
+            json.dumps({
+                "first_name": "John",
+                "last_name": "Doe",
+                "email": f"john{number}@gmail.com",
+                "team": team,
+            })
+            for number, team in enumerate(teams)
+        )
+
+        response = self.client.post(
+            BULK_URL, body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [(error["row"], list(error["errors"])) for error in response.data["errors"]],
+            [(1, ["team"]), (2, ["team"]), (3, ["team"])],
+        )
+
+    def test_bulk_import_body_that_is_not_utf_8(self):
+        body = "first_name,last_name,email\nJosé,Doe,j@gmail.com\n".encode("latin-1")
+
+        response = self.client.post(BULK_URL, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["detail"],
+            "Line 2 is not valid UTF-8: invalid continuation byte.",
+        )
+        self.assertFalse(Person.objects.exists())
+
+    def test_bulk_import_queries_per_chunk(self):
+        sample_team()
+        body = "first_name,last_name,email,team\n" + "".join(
+            f"User,{number},user{number}@gmail.com,Team 1\n" for number in range(10)
+        )
+
+        # Two chunks of: team lookup, email lookup, savepoint, insert,
+        # memberships, updated_at of touched teams, search reindex, change
+        # log, release
+        with mock.patch.object(PersonImporter, "chunk_size", 5):
+            with self.assertNumQueries(18):
+                response = self.client.post(BULK_URL, body, content_type="text/csv")
+
+        self.assertEqual(response.data, {"created": 10, "errors": []})
+
+    def test_bulk_import_unsupported_media_type(self):
+        response = self.client.post(BULK_URL, {"first_name": "John"})
+
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_bulk_assign_people_to_team(self):
+        team = sample_team()
+        people = [
+            sample_person(email=f"user{number}@gmail.com") for number in range(3)
+        ]
+        ids = [person.id for person in people]
+
+        # Team lookup, savepoint, locking read of previous teams,
+        # UPDATE of people, read and insert of memberships, updated_at of
+        # touched teams, search reindex, change log, release
+        with self.assertNumQueries(10):
+            response = self.client.put(
+                BULK_ASSIGN_URL, {"team": team.id, "people": ids}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"team": team.id, "people": ids})
+        self.assertEqual(Person.objects.filter(team=team).count(), 3)
+
+    def test_bulk_assign_unknown_people_changes_nobody(self):
+        team = sample_team()
+        person = sample_person()
+
+        response = self.client.put(
+            BULK_ASSIGN_URL,
+            {"team": team.id, "people": [person.id, 999, 1000]},
+            format="json",
+        )
+
+        person.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("[999, 1000]", response.data["people"][0])
+        self.assertIsNone(person.team)
+
+    def test_bulk_assign_unknown_team(self):
+        person = sample_person()
+
+        response = self.client.put(
+            BULK_ASSIGN_URL, {"team": 999, "people": [person.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("team", response.data)
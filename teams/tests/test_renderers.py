@@ -0,0 +1,69 @@
+import datetime
+import decimal
+import json
+import uuid
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from teams import renderers
+from teams.parsers import FastJSONParser
+from teams.renderers import FastJSONRenderer
+
+
+DATA = {
+    "id": 1,
+    "name": "Zoë \u2028 \u2029 <script>",
+    "ratio": decimal.Decimal("1.50"),
+    "joined": datetime.date(2023, 10, 1),
+    "updated_at": datetime.datetime(2023, 10, 1, 12, 30, tzinfo=datetime.timezone.utc),
+    "key": uuid.UUID(int=1),
+    "members": [{"id": 2, "email": None}],
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(DATA)),
+            json.loads(JSONRenderer().render(DATA)),
+        )
+
+    def test_integer_keys_of_list_field_errors(self):
+        data = {"delete": {0: ["A valid integer is required."]}}
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_line_separators_are_escaped(self):
+        content = FastJSONRenderer().render(DATA)
+
+        self.assertIn(b"\\u2028 \\u2029", content)
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            content = FastJSONRenderer().render(DATA)
+
+        self.assertEqual(content, JSONRenderer().render(DATA))
+
+    def test_indent_is_honoured(self):
+        content = FastJSONRenderer().render(
+            DATA, "application/json; indent=2", {}
+        )
+
+        self.assertIn(b'\n  "id": 1', content)
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def test_parses_json(self):
+        data = FastJSONParser().parse(BytesIO(b'{"name": "Zo\\u00eb"}'))
+
+        self.assertEqual(data, {"name": "Zoë"})
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"name": '))
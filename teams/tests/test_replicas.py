@@ -0,0 +1,132 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from team_service.replicas import STICKY_COOKIE, ReplicaRouter
+from teams.models import Team, TeamClosure, Person, Membership
+from teams.tests.test_team_api import TEAM_URL, detail_url
+
+
+REPLICA = "replica"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Route reads to a second SQLite database acting as a replica. It is
+    registered after the test case setup, so its rows are removed in
+    tearDown. The primary is not wrapped in a test transaction, which would
+    keep every read on it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = connections.configure_settings({
+            "default": {},
+            REPLICA: {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(Path(cls.replica_dir.name) / "replica.sqlite3"),
+            },
+        })[REPLICA]
+
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Team)
+            editor.create_model(TeamClosure)
+            editor.create_model(Person)
+            editor.create_model(Membership)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "adminpass", is_staff=True
+        )
+        self.team = Team.objects.create(name="Primary team")
+        Team.objects.using(REPLICA).create(id=self.team.id, name="Replica team")
+
+    def tearDown(self) -> None:
+        Team.objects.using(REPLICA).all().delete()
+
+    def test_safe_requests_read_from_replica(self):
+        response = self.client.get(detail_url(self.team.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Replica team")
+        self.assertContains(self.client.get(TEAM_URL), "Replica team")
+
+    def test_writes_go_to_primary_and_stick_reads_to_it(self):
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.post(TEAM_URL, {"name": "New team"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Team.objects.using("default").filter(name="New team").exists())
+        self.assertFalse(Team.objects.using(REPLICA).filter(name="New team").exists())
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 5)
+
+        response = self.client.get(TEAM_URL)
+
+        self.assertContains(response, "Primary team")
+        self.assertContains(response, "New team")
+
+        del self.client.cookies[STICKY_COOKIE]
+
+        self.assertContains(self.client.get(TEAM_URL), "Replica team")
+
+    @override_settings(API_CACHE_TIMEOUT=60)
+    def test_cached_responses_are_read_from_primary(self):
+        cache.clear()
+
+        for expected in ("MISS", "HIT"):
+            response = self.client.get(detail_url(self.team.id))
+
+            self.assertEqual(response["X-Cache"], expected)
+            self.assertEqual(response.data["name"], "Primary team")
+
+    def test_writes_outside_requests_read_from_primary(self):
+        person = Person.objects.create(
+            first_name="John", last_name="Doe", email="john@gmail.com", team=self.team
+        )
+
+        # The replica lags: it has neither the person nor the membership
+        person.team = None
+        person.save()
+
+        self.assertFalse(Membership.objects.using("default").exists())
+        self.assertEqual(
+            Team.objects.using("default").get(id=self.team.id).member_count, 0
+        )
+
+    def test_failed_write_does_not_stick(self):
+        response = self.client.post(TEAM_URL, {"name": "New team"})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_replicas_are_not_migrated(self):
+        router = ReplicaRouter()
+
+        self.assertTrue(router.allow_migrate("default", "teams"))
+        self.assertFalse(router.allow_migrate(REPLICA, "teams"))
+        self.assertEqual(router.db_for_write(Team), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_from_primary(self):
+        response = self.client.get(detail_url(self.team.id))
+
+        self.assertEqual(response.data["name"], "Primary team")
@@ -0,0 +1,155 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.models import Person
+from teams.search import parse_terms
+from teams.tests.test_commands import generate
+from teams.tests.test_memberships import membership_url, memberships_url
+from teams.tests.test_person_api import sample_person
+from teams.tests.test_team_api import sample_team
+
+
+SEARCH_URL = reverse("teams:person-search")
+BULK_ASSIGN_URL = reverse("teams:person-bulk-assign-to-team")
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.team = sample_team(name="Platform")
+        self.anna = sample_person(
+            first_name="Anna", last_name="Smith", email="anna@example.com", team=self.team
+        )
+        self.john = sample_person(
+            first_name="John", last_name="Annandale", email="jd@example.com"
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(SEARCH_URL, {"q": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [row["id"] for row in response.data["results"]]
+
+    def test_parse_terms(self):
+        self.assertEqual(
+            parse_terms(" Ann  o'brien, a@b.c "), ["Ann", "o", "brien", "a@b.c"]
+        )
+        self.assertEqual(parse_terms('"*) -'), [])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search(""), [])
+        self.assertEqual(self.search(" * "), [])
+
+    def test_match_every_column(self):
+        self.assertEqual(self.search("smith"), [self.anna.id])
+        self.assertEqual(self.search("jd"), [self.john.id])
+        self.assertEqual(self.search("platform"), [self.anna.id])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search("anna platform"), [self.anna.id])
+        self.assertEqual(self.search("john platform"), [])
+
+    def test_prefix_and_case(self):
+        self.assertEqual(self.search("SMI"), [self.anna.id])
+
+    def test_rank_names_above_team(self):
+        member = sample_person(
+            first_name="Zoe", last_name="Lee", email="zoe@example.com", team=self.team
+        )
+        named = sample_person(
+            first_name="Platform", last_name="Lee", email="pl@example.com"
+        )
+
+        response = self.client.get(SEARCH_URL, {"q": "platform"})
+        ids = [row["id"] for row in response.data["results"]]
+
+        self.assertEqual(ids[0], named.id)
+        self.assertCountEqual(ids[1:], [self.anna.id, member.id])
+        self.assertGreater(
+            response.data["results"][0]["rank"], response.data["results"][1]["rank"]
+        )
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(SEARCH_URL, {"q": "smith", "fields": "id,email"})
+
+        self.assertEqual(
+            [dict(row) for row in response.data["results"]],
+            [{"id": self.anna.id, "email": "anna@example.com"}]
+        )
+
+    def test_person_changes_are_indexed(self):
+        self.anna.last_name = "Kovalenko"
+        self.anna.save()
+
+        self.assertEqual(self.search("smith"), [])
+        self.assertEqual(self.search("koval"), [self.anna.id])
+
+        self.anna.delete()
+
+        self.assertEqual(self.search("koval"), [])
+
+    def test_team_rename_reindexes_members(self):
+        self.team.name = "Infrastructure"
+        self.team.save()
+
+        self.assertEqual(self.search("platform"), [])
+        self.assertEqual(self.search("infra"), [self.anna.id])
+
+    def test_team_save_without_rename_skips_reindex(self):
+        self.team.parent = sample_team(name="Engineering")
+
+        with mock.patch("teams.signals.reindex_people") as reindex_people:
+            self.team.save()
+
+        reindex_people.assert_not_called()
+
+    def test_memberships_are_indexed(self):
+        backend = sample_team(name="Backend")
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@example.com", "password")
+        )
+
+        self.client.post(memberships_url(self.john.id), {"team": backend.id})
+
+        self.assertEqual(self.search("backend"), [self.john.id])
+
+        backend.refresh_from_db()
+        backend.name = "Services"
+        backend.save()
+
+        self.assertEqual(self.search("services"), [self.john.id])
+
+        self.client.delete(membership_url(self.john.id, backend.id))
+
+        self.assertEqual(self.search("services"), [])
+
+    def test_team_delete_reindexes_members(self):
+        self.team.delete()
+
+        self.assertEqual(self.search("platform"), [])
+        self.assertEqual(self.search("smith"), [self.anna.id])
+
+    def test_bulk_assign_reindexes_people(self):
+        support = sample_team(name="Support")
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@example.com", "password")
+        )
+
+        response = self.client.put(
+            BULK_ASSIGN_URL, {"team": support.id, "people": [self.john.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.search("support"), [self.john.id])
+
+    def test_generated_data_is_indexed(self):
+        generate(clear=True)
+
+        response = self.client.get(SEARCH_URL, {"q": "example"})
+
+        self.assertEqual(response.data["count"], Person.objects.count())
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from teams.tests.test_person_api import (
+    PERSON_URL,
+    EXPORT_URL,
+    sample_person,
+    detail_url as person_detail_url,
+)
+from teams.tests.test_team_api import (
+    TEAM_URL,
+    sample_team,
+    detail_url,
+    members_url,
+)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.team = sample_team()
+        self.person = sample_person(team=self.team)
+
+    def get_with_queries(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+
+        return response, [query["sql"] for query in context.captured_queries]
+
+    def test_fields_limits_person_list_and_select(self):
+        response, sql = self.get_with_queries(PERSON_URL, {"fields": "id,email"})
+
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.person.id, "email": self.person.email}],
+        )
+        self.assertNotIn("teams_team", sql[-1])
+        self.assertNotIn("first_name", sql[-1])
+
+    def test_related_source_keeps_join(self):
+        response, sql = self.get_with_queries(PERSON_URL, {"fields": "id,team_name"})
+
+        self.assertEqual(
+            response.data["results"], [{"id": self.person.id, "team_name": "Team 1"}]
+        )
+        self.assertIn("teams_team", sql[-1])
+        self.assertNotIn("email", sql[-1])
+
+    def test_omit_nested_team_on_person_detail(self):
+        response, sql = self.get_with_queries(
+            person_detail_url(self.person.id), {"omit": "team,memberships"}
+        )
+
+        self.assertNotIn("team", response.data)
+        self.assertEqual(response.data["email"], self.person.email)
+        self.assertNotIn("JOIN", sql[-1])
+
+    def test_omit_members_skips_prefetch(self):
+        response, sql = self.get_with_queries(TEAM_URL, {"omit": "members"})
+
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "id": self.team.id,
+                    "name": self.team.name,
+                    "parent": None,
+                    "member_count": 1,
+                }
+            ],
+        )
+        self.assertFalse(any("teams_person" in query for query in sql))
+
+    def test_fields_on_team_detail_keeps_requested_prefetch(self):
+        response = self.client.get(detail_url(self.team.id), {"fields": "members"})
+
+        self.assertEqual(list(response.data), ["members"])
+        self.assertEqual(response.data["members"][0]["email"], self.person.email)
+
+    def test_fields_on_paginated_members_detail(self):
+        response = self.client.get(
+            detail_url(self.team.id), {"fields": "id", "members_limit": 1}
+        )
+
+        self.assertEqual(response.data, {"id": self.team.id})
+
+    def test_fields_on_members_endpoint(self):
+        response = self.client.get(members_url(self.team.id), {"fields": "email"})
+
+        self.assertEqual(response.data["results"], [{"email": self.person.email}])
+
+    def test_fields_on_export(self):
+        response = self.client.get(EXPORT_URL, {"fields": "id", "format": "csv"})
+
+        content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(content.splitlines(), ["id", str(self.person.id)])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(PERSON_URL, {"fields": "id,unknown"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["fields"],
+            [
+                "Unknown fields: unknown. Valid fields are: "
+                "id, first_name, last_name, email, team_name."
+            ],
+        )
+
+    def test_unknown_omitted_fields_are_rejected(self):
+        response = self.client.get(detail_url(self.team.id), {"omit": "nope"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("members", response.data["omit"][0])
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "adminpass", is_staff=True
+            )
+        )
+
+        response = self.client.patch(
+            f"{person_detail_url(self.person.id)}?fields=id", {"last_name": "Smith"}
+        )
+
+        self.assertEqual(response.data["last_name"], "Smith")
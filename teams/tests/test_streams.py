@@ -0,0 +1,215 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from teams import events
+from teams.models import Person
+from teams.streams import EventStreamRouter
+from teams.tests.test_person_api import sample_person
+from teams.tests.test_team_api import sample_team
+
+
+async def django_stand_in(scope, receive, send):
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class Stream:
+    """Drives the ASGI application like a server with one client"""
+
+    def __init__(self, path, method="GET", keepalive=5):
+        self.inbox = asyncio.Queue()
+        self.messages = asyncio.Queue()
+        self.task = asyncio.ensure_future(
+            EventStreamRouter(django_stand_in, keepalive=keepalive)(
+                {"type": "http", "method": method, "path": path},
+                self.inbox.get,
+                self.messages.put,
+            )
+        )
+
+    async def read(self):
+        return await asyncio.wait_for(self.messages.get(), 5)
+
+    async def start(self):
+        """Wait until the stream is subscribed, after its first comment"""
+        start = await self.read()
+        await self.read()
+
+        return start
+
+    async def next_event(self):
+        body = (await self.read())["body"].decode()
+        name, data = body.strip().split("\n")
+
+        return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    async def close(self):
+        await self.inbox.put({"type": "http.disconnect"})
+        await asyncio.wait_for(self.task, 5)
+
+
+class TeamEventStreamTests(TestCase):
+    def setUp(self) -> None:
+        self.team = sample_team()
+        self.other = sample_team(name="Team 2")
+        self.url = f"/api/teams/{self.team.id}/events/"
+
+    def write(self, function):
+        """Run a write and its on_commit callbacks, as a committed request would"""
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return function()
+
+        return sync_to_async(run)()
+
+    async def test_unknown_team(self):
+        stream = Stream("/api/teams/999999/events/")
+        start = await stream.read()
+
+        self.assertEqual(start["status"], 404)
+
+    async def test_other_paths_go_to_django(self):
+        stream = Stream("/api/teams/")
+
+        self.assertEqual((await stream.read())["status"], 204)
+
+    async def test_only_get(self):
+        stream = Stream(self.url, method="POST")
+
+        self.assertEqual((await stream.read())["status"], 405)
+
+    async def test_membership_events(self):
+        stream = Stream(self.url)
+        start = await stream.start()
+
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+
+        person = await self.write(lambda: sample_person(team=self.team))
+        self.assertEqual(
+            await stream.next_event(),
+            (
+                events.MEMBER_JOINED,
+                {"type": events.MEMBER_JOINED, "team": self.team.id, "person": person.id},
+            ),
+        )
+
+        def move():
+            person = Person.objects.get()
+            person.team = self.other
+            person.save()
+
+        await self.write(move)
+        self.assertEqual(
+            await stream.next_event(),
+            (
+                events.MEMBER_LEFT,
+                {"type": events.MEMBER_LEFT, "team": self.team.id, "person": person.id},
+            ),
+        )
+
+        def rename():
+            self.team.name = "Renamed"
+            self.team.save()
+
+        await self.write(rename)
+        self.assertEqual(
+            await stream.next_event(),
+            (
+                events.TEAM_RENAMED,
+                {"type": events.TEAM_RENAMED, "team": self.team.id, "name": "Renamed"},
+            ),
+        )
+
+        await stream.close()
+
+    async def test_events_of_other_teams_are_not_sent(self):
+        stream = Stream(self.url, keepalive=0.05)
+        await stream.start()
+
+        await self.write(lambda: sample_person(team=self.other))
+
+        self.assertEqual((await stream.read())["body"], b": keepalive\n\n")
+        await stream.close()
+
+    async def test_team_delete_ends_the_stream(self):
+        stream = Stream(self.url)
+        await stream.start()
+        person = await self.write(lambda: sample_person(team=self.team))
+        await stream.next_event()
+
+        team_id = self.team.id
+        await self.write(lambda: self.team.delete())
+
+        self.assertEqual(
+            await stream.next_event(),
+            (
+                events.MEMBER_LEFT,
+                {"type": events.MEMBER_LEFT, "team": team_id, "person": person.id},
+            ),
+        )
+        self.assertEqual((await stream.next_event())[0], events.TEAM_DELETED)
+        self.assertEqual(await stream.read(), {"type": "http.response.body", "body": b""})
+
+    async def test_disconnect_unsubscribes(self):
+        streams = [Stream(self.url), Stream(self.url)]
+
+        for stream in streams:
+            await stream.start()
+
+        fanout = events.get_fanout()
+        self.assertEqual(len(fanout.subscriptions[self.team.id]), 2)
+
+        for stream in streams:
+            await stream.close()
+
+        self.assertNotIn(self.team.id, fanout.subscriptions)
+
+
+class PostgresBrokerTests(TestCase):
+    def test_payloads_stay_under_the_notify_limit(self):
+        broker = events.PostgresBroker()
+        broker.max_payload = 100
+        moves = [(person, 1, 2) for person in range(10)]
+
+        payloads = list(broker.payloads(events.membership_events(moves)))
+
+        self.assertGreater(len(payloads), 1)
+        self.assertTrue(all(len(payload) <= 100 for payload in payloads))
+        self.assertEqual(
+            [event for payload in payloads for event in json.loads(payload)],
+            events.membership_events(moves),
+        )
+
+    def test_bad_notifications_are_skipped(self):
+        delivered = []
+
+        def deliver(events):
+            if events == ["fail"]:
+                raise ValueError("fail")
+
+            delivered.append(events)
+
+        with self.assertLogs("teams.events", "ERROR") as logs:
+            for payload in ("not json", '["fail"]', '[{"team": 1}]'):
+                events.PostgresBroker.dispatch(payload, deliver)
+
+        self.assertEqual(delivered, [[{"team": 1}]])
+        self.assertEqual(len(logs.records), 2)
+
+    def test_listener_reconnects_after_any_error(self):
+        broker = events.PostgresBroker()
+
+        # KeyboardInterrupt stands for the interpreter shutdown ending the thread
+        with mock.patch.object(
+            broker, "connect", side_effect=[RuntimeError("down"), KeyboardInterrupt]
+        ) as connect, mock.patch.object(events.threading, "Event"):
+            with self.assertLogs("teams.events", "ERROR"):
+                with self.assertRaises(KeyboardInterrupt):
+                    broker.listen(lambda events: None)
+
+        self.assertEqual(connect.call_count, 2)
@@ -1,15 +1,24 @@
+import csv
+import json
+import threading
+import warnings
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import AsyncClient, TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from teams.models import Team
+from teams.models import Team, Person, Membership
 from teams.pagination import ApiPagination
-from teams.serializers import TeamSerializer, TeamDetailSerializer
+from teams.serializers import TeamSerializer, TeamDetailSerializer, MemberSerializer
+from teams.tests.utils import QueryCountMixin
+from teams.views import TeamViewSet, iterate_in_thread
 
 
 TEAM_URL = reverse("teams:team-list")
+EXPORT_URL = reverse("teams:team-export")
 
 
 def sample_team(**params):
@@ -25,7 +34,30 @@ def detail_url(team_id):
     return reverse("teams:team-detail", args=[team_id])
 
 
-class UnauthenticatedTeamApiTests(TestCase):
+def members_url(team_id):
+    return reverse("teams:team-members", args=[team_id])
+
+
+def sample_members(team, count):
+    """bulk_create skips the signals, the memberships are written here"""
+    offset = team.members.count()
+    people = Person.objects.bulk_create(
+        Person(
+            first_name=f"User {number}",
+            last_name=f"Last Name {number}",
+            email=f"team{team.id}.user{number}@gmail.com",
+            team=team,
+        )
+        for number in range(offset, offset + count)
+    )
+    Membership.objects.bulk_create(
+        Membership(team=team, person=person) for person in people
+    )
+
+    return people
+
+
+class UnauthenticatedTeamApiTests(QueryCountMixin, TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
 
@@ -53,6 +85,120 @@ class UnauthenticatedTeamApiTests(TestCase):
         self.assertContains(response, team2.name)
         self.assertNotContains(response, team3.name)
 
+    def test_list_teams_with_cursor_pagination(self):
+        teams = [sample_team(name=f"Team {number}") for number in range(7)]
+
+        response = self.client.get(TEAM_URL, {"cursor": ""})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            [team["id"] for team in response.data["results"]],
+            [team.id for team in teams[:5]],
+        )
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            [team["id"] for team in response.data["results"]],
+            [team.id for team in teams[5:]],
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_cursor_pagination_keeps_name_filter(self):
+        for number in range(6):
+            sample_team(name=f"Team {number}")
+            sample_team(name=f"Another {number}")
+
+        response = self.client.get(TEAM_URL, {"cursor": "", "name": "team"})
+        self.assertIn("name=team", response.data["next"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Team 5")
+
+    def test_list_teams_invalid_cursor(self):
+        response = self.client.get(TEAM_URL, {"cursor": "invalid"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_teams_ndjson(self):
+        team = sample_team()
+        sample_members(team, 2)
+        sample_team(name="Another")
+
+        response = self.client.get(EXPORT_URL, {"name": "team"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [json.loads(json.dumps(TeamDetailSerializer(team).data))],
+        )
+
+    def test_export_teams_csv(self):
+        team = sample_team()
+        sample_members(team, 1)
+
+        response = self.client.get(EXPORT_URL, {"format": "csv"})
+
+        rows = list(csv.reader(
+            b"".join(response.streaming_content).decode().splitlines()
+        ))
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(rows[0], ["id", "name", "parent", "members"])
+        self.assertEqual(rows[1][:3], [str(team.id), team.name, ""])
+        self.assertEqual(
+            json.loads(rows[1][3]), TeamDetailSerializer(team).data["members"]
+        )
+
+    async def test_export_streams_under_asgi(self):
+        teams = [await Team.objects.acreate(name=f"Team {number}") for number in (1, 2)]
+
+        with mock.patch.object(TeamViewSet, "export_chunk_size", 1):
+            response = await AsyncClient().get(EXPORT_URL)
+
+            # Sync content is read to the end, with a warning, before sending
+            self.assertTrue(response.is_async)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                lines = [line async for line in response.streaming_content]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in lines], [team.id for team in teams]
+        )
+
+    async def test_export_under_asgi_closes_rows_in_the_view_thread(self):
+        closed_in = []
+
+        def rows():
+            try:
+                yield from range(10)
+            finally:
+                closed_in.append(threading.get_ident())
+
+        content = iterate_in_thread(rows(), 2)
+
+        self.assertEqual(await anext(content), 0)
+
+        await content.aclose()
+
+        self.assertEqual(len(closed_in), 1)
+        self.assertNotEqual(closed_in[0], threading.get_ident())
+
+    def test_export_teams_query_count_does_not_depend_on_rows(self):
+        def populate(size):
+            for number in range(size):
+                sample_members(sample_team(name=f"Team {size}.{number}"), 2)
+
+        self.assertConstantQueries(EXPORT_URL, populate)
+
     def test_retrieve_team_detail(self):
         team = sample_team()
 
@@ -64,6 +210,95 @@ class UnauthenticatedTeamApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_list_teams_query_count_does_not_depend_on_page_size(self):
+        def populate(size):
+            Team.objects.all().delete()
+
+            for number in range(size):
+                sample_members(sample_team(name=f"Team {number}"), 3)
+
+        self.assertConstantQueries(TEAM_URL, populate)
+
+    def test_retrieve_team_query_count_does_not_depend_on_members(self):
+        team = sample_team()
+
+        self.assertConstantQueries(
+            detail_url(team.id), lambda size: sample_members(team, size)
+        )
+
+    def test_retrieve_team_detail_with_members(self):
+        team = sample_team()
+        sample_members(team, 3)
+
+        response = self.client.get(detail_url(team.id))
+
+        serializer = TeamDetailSerializer(team)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, serializer.data)
+
+
+class TeamMembersPaginationTests(QueryCountMixin, TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.team = sample_team()
+        self.members = sample_members(self.team, 7)
+
+    def test_members_endpoint_is_paginated(self):
+        response = self.client.get(members_url(self.team.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(
+            [member["id"] for member in response.data["results"]],
+            [member.id for member in self.members[:5]],
+        )
+
+    def test_members_endpoint_with_cursor(self):
+        response = self.client.get(members_url(self.team.id), {"cursor": ""})
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            [member["email"] for member in response.data["results"]],
+            [member.email for member in self.members[5:]],
+        )
+
+    def test_members_endpoint_query_count_does_not_depend_on_members(self):
+        self.assertConstantQueries(
+            members_url(self.team.id),
+            lambda size: sample_members(self.team, size),
+            params={"cursor": ""},
+        )
+
+    def test_members_of_missing_team(self):
+        response = self.client.get(members_url(999))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_with_members_limit(self):
+        response = self.client.get(detail_url(self.team.id), {"members_limit": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["members"],
+            MemberSerializer(self.team.memberships.all()[:3], many=True).data,
+        )
+
+        ids = [member["id"] for member in response.data["members"]]
+
+        while response.data["members_next"]:
+            response = self.client.get(response.data["members_next"])
+            ids += [member["id"] for member in response.data["members"]]
+
+        self.assertEqual(ids, [member.id for member in self.members])
+
+    def test_members_limit_is_capped(self):
+        sample_members(self.team, 150)
+
+        response = self.client.get(detail_url(self.team.id), {"members_limit": 1000})
+
+        self.assertEqual(len(response.data["members"]), 100)
+
 
 class AuthenticatedTeamApiTests(TestCase):
     def setUp(self) -> None:
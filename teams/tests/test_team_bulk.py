@@ -0,0 +1,223 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.bulk import TeamBulkWriter
+from teams.hierarchy import rebuild_closure
+from teams.models import Team, Person, Membership, Change
+from teams.tests.test_changes import changes, last_sequence
+from teams.tests.test_hierarchy import closure
+from teams.tests.test_memberships import memberships_url
+from teams.tests.test_person_api import sample_person
+from teams.tests.test_team_api import sample_team
+
+
+BULK_URL = reverse("teams:team-bulk")
+
+
+def statuses(results):
+    return [(result["index"], result["status"]) for result in results]
+
+
+def errors(results):
+    return {
+        result["index"]: sorted(result["errors"])
+        for result in results if result["status"] == TeamBulkWriter.ERROR
+    }
+
+
+class TeamBulkTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@test.com", "adminpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.company = sample_team(name="company")
+        self.sales = sample_team(name="sales", parent=self.company)
+
+    def bulk(self, **payload):
+        response = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    def test_upsert_by_name(self):
+        sequence = last_sequence()
+
+        report = self.bulk(
+            upsert=[
+                {"name": "sales"},
+                {"name": "support", "parent": self.sales.id},
+            ]
+        )
+
+        support = Team.objects.get(name="support")
+        self.assertEqual(
+            report["upsert"],
+            [
+                {"index": 0, "status": "updated", "id": self.sales.id, "name": "sales"},
+                {"index": 1, "status": "created", "id": support.id, "name": "support"},
+            ],
+        )
+        # Without a parent the team stays where it is
+        self.assertEqual(Team.objects.get(name="sales").parent, self.company)
+        self.assertIn(("company", "support", 2), closure())
+        self.assertEqual(
+            changes(sequence),
+            [
+                (Change.TEAM, support.id, Change.CREATED),
+                (Change.TEAM, self.sales.id, Change.UPDATED),
+            ],
+        )
+
+    def test_upsert_moves_teams(self):
+        report = self.bulk(
+            upsert=[
+                {"name": "company", "parent": self.sales.id},
+                {"name": "sales", "parent": None},
+                {"name": "sales"},
+            ]
+        )
+
+        self.assertEqual(
+            statuses(report["upsert"]), [(0, "error"), (1, "updated"), (2, "error")]
+        )
+        self.assertEqual(errors(report["upsert"]), {0: ["parent"], 2: ["name"]})
+
+        # The second move is only a cycle once the first one is applied
+        report = self.bulk(
+            upsert=[
+                {"name": "company", "parent": self.sales.id},
+                {"name": "sales", "parent": self.company.id},
+            ]
+        )
+
+        self.assertEqual(statuses(report["upsert"]), [(0, "updated"), (1, "error")])
+        self.assertEqual(Team.objects.get(name="sales").parent, None)
+        expected = closure()
+        rebuild_closure()
+        self.assertEqual(closure(), expected)
+        self.assertIn(("sales", "company", 1), expected)
+
+    def test_upsert_reports_item_errors(self):
+        report = self.bulk(
+            upsert=[
+                {"name": ""},
+                {"name": "new", "parent": 999},
+                "not an object",
+                {"name": "new"},
+            ]
+        )
+
+        self.assertEqual(
+            errors(report["upsert"]),
+            {0: ["name"], 1: ["parent"], 2: ["non_field_errors"]},
+        )
+        self.assertEqual(statuses(report["upsert"])[3], (3, "created"))
+
+    def test_delete_by_id(self):
+        person = sample_person(team=self.sales)
+        other = sample_person(email="other@gmail.com", team=self.company)
+        self.client.post(memberships_url(other.id), {"team": self.sales.id})
+        sequence = last_sequence()
+
+        report = self.bulk(delete=[self.company.id, 999, self.sales.id])
+
+        self.assertEqual(
+            statuses(report["delete"]), [(0, "deleted"), (1, "error"), (2, "deleted")]
+        )
+        self.assertFalse(Team.objects.exists())
+        self.assertFalse(Membership.objects.exists())
+        self.assertEqual(closure(), set())
+        self.assertEqual(
+            list(Person.objects.values_list("team", flat=True)), [None, None]
+        )
+        self.assertEqual(
+            sorted(changes(sequence)),
+            sorted(
+                [
+                    (Change.TEAM, self.company.id, Change.DELETED),
+                    (Change.TEAM, self.sales.id, Change.DELETED),
+                    (Change.PERSON, person.id, Change.UPDATED),
+                    (Change.PERSON, other.id, Change.UPDATED),
+                ]
+            ),
+        )
+
+    def test_team_with_children_is_not_deleted(self):
+        sample_team(name="emea", parent=self.sales)
+
+        report = self.bulk(delete=[self.company.id, self.sales.id])
+
+        self.assertEqual(errors(report["delete"]), {0: ["id"], 1: ["id"]})
+        self.assertEqual(Team.objects.count(), 3)
+
+    def test_delete_reports_integrity_errors(self):
+        with mock.patch.object(
+            TeamBulkWriter, "write_deletes", side_effect=IntegrityError("conflict")
+        ):
+            report = self.bulk(delete=[self.sales.id, 999])
+
+        self.assertEqual(
+            report["delete"],
+            [
+                {
+                    "index": 0,
+                    "status": "error",
+                    "errors": {"non_field_errors": ["conflict"]},
+                },
+                {"index": 1, "status": "error", "errors": {"id": ["Not found."]}},
+            ],
+        )
+        self.assertEqual(Team.objects.count(), 2)
+
+    def test_queries_per_batch(self):
+        counts = {"upsert": [], "delete": []}
+
+        # Upserts: existing names, savepoint, insert, ids, closure of the new
+        # teams, change log and release for each batch. Deletes: existing ids,
+        # children, savepoint, members, the collector's teams and children,
+        # memberships, closure rows, primary members, teams, updated_at of the
+        # members, search reindex, change log and release for each batch
+        for size in (2, 4):
+            payload = [{"name": f"team {size}.{number}"} for number in range(size)]
+
+            with mock.patch.object(TeamBulkWriter, "batch_size", 2):
+                with CaptureQueriesContext(connection) as context:
+                    self.bulk(upsert=payload)
+
+                counts["upsert"].append(len(context.captured_queries))
+                teams = list(Team.objects.filter(name__startswith=f"team {size}."))
+
+                for team in teams:
+                    sample_person(email=f"person{team.id}@gmail.com", team=team)
+
+                with CaptureQueriesContext(connection) as context:
+                    self.bulk(delete=[team.id for team in teams])
+
+                counts["delete"].append(len(context.captured_queries))
+
+        self.assertEqual(counts, {"upsert": [7, 14], "delete": [14, 28]})
+
+    def test_invalid_request(self):
+        response = self.client.post(BULK_URL, {"delete": ["x"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("delete", response.data)
+
+    def test_forbidden_for_non_admin(self):
+        self.user.is_staff = False
+
+        response = self.client.post(
+            BULK_URL, {"delete": [self.company.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Team.objects.filter(id=self.company.id).exists())
@@ -0,0 +1,137 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from teams.models import Person
+from teams.serializers import (
+    TeamSerializer,
+    TeamListSerializer,
+    TeamDetailSerializer,
+    PersonListSerializer,
+    PersonDetailSerializer,
+)
+from teams.tests.test_person_api import (
+    PERSON_URL,
+    sample_person,
+    detail_url as person_detail_url,
+)
+from teams.tests.test_team_api import (
+    TEAM_URL,
+    sample_team,
+    sample_members,
+    detail_url,
+    members_url,
+)
+from teams.tests.utils import QueryCountMixin
+
+
+class ValuesSerializerParityTests(QueryCountMixin, TestCase):
+    """The values() path must render the same bytes as the serializers"""
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.team = sample_team()
+        self.empty_team = sample_team(name="Team 2")
+        sample_members(self.team, 3)
+        self.person = sample_person(team=self.team)
+        self.loner = sample_person(
+            first_name="Jane", last_name="Roe", email="jane.roe@gmail.com"
+        )
+
+    def get_both(self, url, params=None):
+        with override_settings(API_VALUES_SERIALIZERS=False):
+            expected = self.client.get(url, params)
+
+        with override_settings(API_VALUES_SERIALIZERS=True):
+            response = self.client.get(url, params)
+
+        return expected, response
+
+    def assertSameResponse(self, url, params=None):
+        expected, response = self.get_both(url, params)
+
+        self.assertEqual(expected.status_code, response.status_code)
+        self.assertEqual(expected.content, response.content)
+
+    def test_person_list(self):
+        for params in (
+            None,
+            {"page": 2, "page_size": 2},
+            {"cursor": "", "page_size": 2},
+            {"last_name": "roe"},
+            {"fields": "id,team_name"},
+            {"omit": "email"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameResponse(PERSON_URL, params)
+
+    def test_person_detail(self):
+        for person in (self.person, self.loner):
+            with self.subTest(person=person):
+                self.assertSameResponse(person_detail_url(person.id))
+                self.assertSameResponse(
+                    person_detail_url(person.id), {"fields": "id,team"}
+                )
+
+    def test_missing_person(self):
+        self.assertSameResponse(person_detail_url(0))
+
+    def test_team_list(self):
+        for params in (
+            None,
+            {"ordering": "-member_count", "cursor": ""},
+            {"fields": "id,name"},
+            {"min_members": 1},
+        ):
+            with self.subTest(params=params):
+                self.assertSameResponse(TEAM_URL, params)
+
+    def test_team_detail_with_members(self):
+        for team in (self.team, self.empty_team):
+            with self.subTest(team=team):
+                self.assertSameResponse(detail_url(team.id))
+                self.assertSameResponse(detail_url(team.id), {"omit": "members"})
+                self.assertSameResponse(detail_url(team.id), {"members_limit": 2})
+
+    def test_team_members(self):
+        self.assertSameResponse(members_url(self.team.id), {"page_size": 2})
+
+    def test_list_rows_are_not_model_instances(self):
+        with override_settings(API_VALUES_SERIALIZERS=True):
+            response = self.client.get(PERSON_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data["results"][0], dict)
+
+    @override_settings(API_VALUES_SERIALIZERS=True)
+    def test_team_detail_queries_are_constant(self):
+        self.assertConstantQueries(
+            detail_url(self.team.id), lambda size: sample_members(self.team, size)
+        )
+
+
+class ValuesPlanTests(TestCase):
+
+    def test_read_serializers_compile(self):
+        for serializer_class in (
+            TeamListSerializer,
+            TeamDetailSerializer,
+            PersonListSerializer,
+            PersonDetailSerializer,
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertIsNotNone(serializer_class().get_values_plan())
+
+    def test_unmapped_fields_fall_back(self):
+        self.assertFalse(hasattr(TeamSerializer(), "get_values_plan"))
+
+    def test_plan_matches_serializer(self):
+        sample_person(team=sample_team())
+        plan = PersonDetailSerializer().get_values_plan()
+
+        rows = plan.values(Person.objects.all())
+
+        self.assertEqual(
+            plan.render(rows),
+            PersonDetailSerializer(Person.objects.all(), many=True).data,
+        )
@@ -0,0 +1,34 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+
+class QueryCountMixin:
+    """Assertions on the number of SQL queries an endpoint runs"""
+
+    def count_queries(self, url, params=None):
+        """Return the number of queries executed by a GET request to url"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, populate, sizes=(1, 2, 5), params=None):
+        """
+        Call populate(size) before each request and check that the
+        query count does not grow with the amount of rendered rows
+        """
+        counts = []
+
+        for size in sizes:
+            populate(size)
+            counts.append(self.count_queries(url, params))
+
+        self.assertEqual(
+            len(set(counts)), 1, f"Query count changed with size: {counts}"
+        )
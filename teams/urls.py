@@ -1,14 +1,22 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from teams.views import TeamViewSet, PersonViewSet
+from teams.async_views import AsyncTeamView, AsyncPersonView
+from teams.views import TeamViewSet, PersonViewSet, ChangeViewSet
 
 router = routers.DefaultRouter()
 router.register("teams", TeamViewSet)
 router.register("people", PersonViewSet)
+router.register("changes", ChangeViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/teams/", AsyncTeamView.as_view(), name="async-team-list"),
+    path("async/teams/<pk>/", AsyncTeamView.as_view(), name="async-team-detail"),
+    path("async/people/", AsyncPersonView.as_view(), name="async-person-list"),
+    path(
+        "async/people/<pk>/", AsyncPersonView.as_view(), name="async-person-detail"
+    ),
 ]
 
 app_name = "teams"
@@ -1,23 +1,255 @@
-from rest_framework import viewsets, status
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Prefetch, RestrictedError
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import mixins, viewsets, status
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from teams.models import Team, Person
-from teams.pagination import ApiPagination
+from teams.bulk import PersonImporter, TeamBulkWriter, parse_rows
+from teams.cache import CacheResponseMixin, team_tag
+from teams.conditional import ConditionalRetrieveMixin
+from teams.filters import filter_teams, filter_people
+from teams.hierarchy import subtree
+from teams.models import Team, Person, Membership, Change
+from teams.pagination import (
+    ApiPagination,
+    ChangeFeedPagination,
+    MembersPagination,
+    SearchPagination,
+)
 from teams.permissions import IsAdminOrReadOnly
+from teams.renderers import NDJSONRenderer, CSVRenderer
+from teams.search import search_people
+from teams.signals import memberships_changed
 from teams.serializers import (
+    SparseFieldsetMixin,
+    ValuesSerializerMixin,
     TeamSerializer,
     TeamDetailSerializer,
+    TeamDetailPaginatedSerializer,
+    TeamBulkSerializer,
+    MemberSerializer,
     PersonSerializer,
     PersonListSerializer,
     PersonDetailSerializer,
+    PersonMembershipSerializer,
+    PersonSearchSerializer,
+    PersonImportSerializer,
     AssignPersonToTeamSerializer,
+    AssignPeopleToTeamSerializer,
+    ChangeSerializer,
 )
 
 
-class TeamViewSet(viewsets.ModelViewSet):
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description="Comma separated fields to render (ex. ?fields=id,email)",
+    ),
+    OpenApiParameter(
+        "omit",
+        type=OpenApiTypes.STR,
+        description="Comma separated fields to leave out (ex. ?omit=members)",
+    ),
+]
+
+
+def member_prefetch(serializer_class):
+    """Prefetch of the members a team serializer renders, None if it renders none"""
+    if serializer_class is TeamSerializer:
+        return Prefetch(
+            "members", queryset=Person.objects.only("id", "first_name", "last_name")
+        )
+
+    if serializer_class is TeamDetailSerializer:
+        return Prefetch(
+            "memberships",
+            queryset=Membership.objects.select_related("person").only(
+                *MemberSerializer.only_fields
+            ),
+        )
+
+    return None
+
+
+def membership_prefetch():
+    """Prefetch of the teams the person detail renders"""
+    return Prefetch(
+        "memberships",
+        queryset=Membership.objects.select_related("team").only(
+            *PersonMembershipSerializer.only_fields
+        ),
+    )
+
+
+class SparseFieldsetViewMixin:
+    """Trim the queryset to the fields selected with ?fields= / ?omit="""
+
+    def filter_queryset(self, queryset):
+        return self.trim_queryset(super().filter_queryset(queryset))
+
+    def trim_queryset(self, queryset):
+        if not SparseFieldsetMixin.is_requested(self.request):
+            return queryset
+
+        serializer = self.get_serializer()
+
+        if (
+            not isinstance(serializer, SparseFieldsetMixin)
+            or serializer.Meta.model is not queryset.model
+        ):
+            return queryset
+
+        plan = serializer.get_queryset_plan()
+
+        if plan is None:
+            return queryset
+
+        only, select_related, prefetch_related = plan
+        prefetch_lookups = [
+            lookup
+            for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, "prefetch_to", lookup).split("__")[0]
+            in prefetch_related
+        ]
+
+        queryset = queryset.only(*only).select_related(None)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        return queryset.prefetch_related(None).prefetch_related(*prefetch_lookups)
+
+
+class ValuesReadMixin:
+    """
+    Serve list and retrieve from .values() rows when API_VALUES_SERIALIZERS
+    is on and the serializer compiles to a row function. Rows skip object
+    permission checks, only use it on views with request-level permissions
+    """
+
+    def get_values_plan(self):
+        if not settings.API_VALUES_SERIALIZERS:
+            return None
+
+        serializer = self.get_serializer()
+
+        if (
+            not isinstance(serializer, ValuesSerializerMixin)
+            or serializer.Meta.model is not self.queryset.model
+        ):
+            return None
+
+        return serializer.get_values_plan()
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan()
+
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+
+        return Response(plan.render(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        plan = self.get_values_plan()
+
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            plan.values(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+
+        return Response(plan.render([row])[0])
+
+
+async def iterate_in_thread(iterable, chunk_size):
+    """
+    Async iterator over a sync one, read chunk_size items at a time in the
+    thread of the sync view, which holds its database connection. A client
+    that leaves early closes it there too, with the server-side cursor,
+    instead of on the event loop
+    """
+    iterator = iter(iterable)
+    read_chunk = sync_to_async(lambda: list(islice(iterator, chunk_size)))
+
+    try:
+        while chunk := await read_chunk():
+            for item in chunk:
+                yield item
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+class ExportMixin:
+    """
+    Add an unpaginated export action streamed from a server-side cursor,
+    under ASGI through an async iterator, which Django would otherwise read
+    to the end before sending anything
+    """
+    export_chunk_size = 2000
+
+    @extend_schema(responses={status.HTTP_200_OK: OpenApiTypes.STR})
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=(NDJSONRenderer, CSVRenderer),
+    )
+    def export(self, request):
+        """Endpoint for exporting every filtered row as NDJSON or CSV"""
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        renderer = request.accepted_renderer
+
+        rows = (
+            serializer.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+
+        content = renderer.render_rows(rows, fields=list(serializer.fields))
+
+        if isinstance(request._request, ASGIRequest):
+            content = iterate_in_thread(content, self.export_chunk_size)
+
+        response = StreamingHttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.basename}.{renderer.format}"'
+        )
+
+        return response
+
+
+class TeamViewSet(
+    ConditionalRetrieveMixin,
+    CacheResponseMixin,
+    SparseFieldsetViewMixin,
+    ValuesReadMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -25,22 +257,108 @@ class TeamViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve the team with filter"""
-        name = self.request.query_params.get("name")
+        queryset = filter_teams(super().get_queryset(), self.request.query_params)
 
-        queryset = super().get_queryset()
+        prefetch = member_prefetch(self.get_serializer_class())
 
-        if name:
-            queryset = queryset.filter(name__icontains=name)
+        if self.action in ("list", "retrieve", "export") and prefetch:
+            queryset = queryset.prefetch_related(prefetch)
 
         return queryset
 
     def get_serializer_class(self):
         """Distribution of serializers by actions"""
-        if self.action == "retrieve":
+        if self.action == "retrieve" and MembersPagination.is_requested(self.request):
+            return TeamDetailPaginatedSerializer
+
+        if self.action in ("retrieve", "export"):
             return TeamDetailSerializer
 
+        if self.action == "members":
+            return MemberSerializer
+
+        if self.action == "all_members":
+            return PersonListSerializer
+
+        if self.action == "bulk":
+            return TeamBulkSerializer
+
         return super().get_serializer_class()
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "members_limit",
+                type=OpenApiTypes.INT,
+                description="Embed at most this many members and a members_next link",
+            ),
+            OpenApiParameter(
+                "members_cursor",
+                type=OpenApiTypes.STR,
+                description="Cursor of the embedded members page (from members_next)",
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ]
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Team detail, members can be paginated with members_limit"""
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=["get"])
+    def members(self, request, pk):
+        """Endpoint for paginating through the members of the team"""
+        team = self.get_object()
+        # The (team, person) index is read in order, no sort of every member
+        queryset = self.trim_queryset(
+            team.memberships.select_related("person")
+            .only(*MemberSerializer.only_fields)
+            .order_by("person_id")
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], url_path="all-members")
+    def all_members(self, request, pk):
+        """Endpoint for paginating through the members of the team and its subteams"""
+        team = self.get_object()
+        # People in several teams of the subtree are listed once
+        memberships = Membership.objects.filter(
+            person=OuterRef("pk"), team__in=subtree(team.id)
+        )
+        queryset = self.trim_queryset(
+            Person.objects.filter(Exists(memberships))
+            .select_related("team")
+            .only(*PersonSerializer.Meta.fields, "team__name")
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(responses={status.HTTP_200_OK: OpenApiTypes.OBJECT})
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Endpoint for upserting teams by name and deleting teams by id in batches"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = TeamBulkWriter().run(**serializer.validated_data)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    def destroy(self, request, *args, **kwargs):
+        """A team with child teams is kept, they have to move or go first"""
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except RestrictedError:
+            return Response(
+                {"detail": "The team has child teams, move or delete them first."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -48,6 +366,23 @@ class TeamViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.STR,
                 description="Filter by team name (ex. ?name=Team 1)",
             ),
+            OpenApiParameter(
+                "min_members",
+                type=OpenApiTypes.INT,
+                description="Filter by minimal number of members (ex. ?min_members=5)",
+            ),
+            OpenApiParameter(
+                "ancestor",
+                type=OpenApiTypes.INT,
+                description="Filter by teams under a team, any depth (ex. ?ancestor=3)",
+            ),
+            OpenApiParameter(
+                "ordering",
+                type=OpenApiTypes.STR,
+                enum=["id", "-id", "name", "-name", "member_count", "-member_count"],
+                description="Order teams (ex. ?ordering=-member_count)",
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -55,36 +390,108 @@ class TeamViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class PersonViewSet(viewsets.ModelViewSet):
+class PersonViewSet(
+    ConditionalRetrieveMixin,
+    CacheResponseMixin,
+    SparseFieldsetViewMixin,
+    ValuesReadMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Person.objects.select_related("team")
     serializer_class = PersonSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = ApiPagination
+    # A membership change bumps updated_at, a team write bumps its own
+    validator_fields = (
+        "updated_at",
+        "team_id",
+        Count("memberships"),
+        Max("memberships__team__updated_at"),
+    )
 
     def get_queryset(self):
         """Retrieve the person with filter"""
-        last_name = self.request.query_params.get("last_name")
-
-        queryset = super().get_queryset()
+        queryset = filter_people(super().get_queryset(), self.request.query_params)
 
-        if last_name:
-            queryset = queryset.filter(last_name__icontains=last_name)
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(membership_prefetch())
 
         return queryset
 
+    def get_data_cache_tags(self, data):
+        """The person detail embeds the names of their teams"""
+        if self.action != "retrieve":
+            return []
+
+        teams = [membership["team"] for membership in data.get("memberships", ())]
+
+        if data.get("team"):
+            teams.append(data["team"]["id"])
+
+        return [team_tag(team) for team in dict.fromkeys(teams)]
+
     def get_serializer_class(self):
         """Distribution of serializers by actions"""
-        if self.action == "list":
+        if self.action in ("list", "export"):
             return PersonListSerializer
 
         if self.action == "retrieve":
             return PersonDetailSerializer
 
+        if self.action == "search":
+            return PersonSearchSerializer
+
         if self.action == "assign_to_team":
             return AssignPersonToTeamSerializer
 
+        if self.action == "memberships":
+            return PersonMembershipSerializer
+
+        if self.action == "bulk_assign_to_team":
+            return AssignPeopleToTeamSerializer
+
+        if self.action == "bulk_import":
+            return PersonImportSerializer
+
         return super().get_serializer_class()
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description="Words to find in names, email and team (ex. ?q=ann smi)",
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ]
+    )
+    @action(detail=False, methods=["get"], pagination_class=SearchPagination)
+    def search(self, request):
+        """Endpoint for full-text search of people, best matches first"""
+        queryset = self.filter_queryset(
+            search_people(self.get_queryset(), request.query_params.get("q", ""))
+        )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        request={
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={status.HTTP_200_OK: OpenApiTypes.OBJECT},
+    )
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_import(self, request):
+        """Endpoint for importing people from a streamed CSV or NDJSON body"""
+        report = PersonImporter().run(parse_rows(request))
+
+        return Response(report, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["put"], url_path="assign-to-team")
     def assign_to_team(self, request, pk):
         """Endpoint for assigning the specific person to a team"""
@@ -95,6 +502,63 @@ class PersonViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["post"])
+    def memberships(self, request, pk):
+        """Endpoint for adding the person to a team, or changing their role in it"""
+        person = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+
+        if serializer.is_valid(raise_exception=True):
+            serializer.save(person=person)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(request=None, responses={status.HTTP_204_NO_CONTENT: None})
+    @action(
+        detail=True,
+        methods=["delete"],
+        url_path=r"memberships/(?P<team_id>\d+)",
+        url_name="membership",
+    )
+    def remove_membership(self, request, pk, team_id):
+        """Endpoint for removing the person from one of their teams"""
+        person = self.get_object()
+        team_id = int(team_id)
+
+        # Leaving the primary team is a move, as with assign-to-team
+        if person.team_id == team_id:
+            person.team = None
+            person.save()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        with transaction.atomic():
+            deleted, _ = Membership.objects.filter(
+                person=person, team_id=team_id
+            ).delete()
+
+            if not deleted:
+                raise NotFound("The person is not a member of this team.")
+
+            Person.objects.filter(id=person.id).update(updated_at=timezone.now())
+            memberships_changed.send(
+                sender=Membership, moves=[(person.id, team_id, None)]
+            )
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=["put"],
+        url_path="assign-to-team",
+        url_name="bulk-assign-to-team",
+    )
+    def bulk_assign_to_team(self, request):
+        """Endpoint for assigning many people to a team in one transaction"""
+        serializer = self.get_serializer(data=request.data)
+
+        if serializer.is_valid(raise_exception=True):
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -102,8 +566,17 @@ class PersonViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.STR,
                 description="Filter by last name of person (ex. ?last_name=Smith)",
             ),
+            *SPARSE_FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         """List people with filter by last name"""
         return super().list(request, *args, **kwargs)
+
+
+class ChangeViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Feed of team and person writes in sequence order, for incremental sync"""
+    queryset = Change.objects.all()
+    serializer_class = ChangeSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = ChangeFeedPagination